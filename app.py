@@ -1,16 +1,38 @@
 """Flask module with methods for managing films and actors."""
 
 
+import hmac
+import io
+import time
+from datetime import timedelta
+from functools import partial
 from os import environ
+from pathlib import Path
 from uuid import UUID
 
+import click
 from dotenv import load_dotenv
-from flask import Flask, redirect, render_template, request
+from flask import Flask, redirect, render_template, request, send_file
+from flask import session as browser_session
+from flask import url_for
 from flask_wtf import FlaskForm
-from wtforms import StringField, SubmitField
+from jinja2 import FileSystemBytecodeCache
+from wtforms import IntegerField, StringField, SubmitField
+from wtforms.validators import NumberRange, Optional
 
+import cast_import
+import changes
 import config
 import db
+import fragments
+import group_commit
+import images
+import json_api
+import query_counter
+import recommendations
+import refresh
+import snapshot
+from models import Actor, Film, FilmToActor
 
 load_dotenv()
 
@@ -18,17 +40,139 @@ load_dotenv()
 app = Flask(__name__)
 app.json.ensure_ascii = False
 app.config['SECRET_KEY'] = environ.get('SECRET_KEY')
+app.jinja_env.globals['DETAIL_IMAGE_WIDTH'] = config.DETAIL_IMAGE_WIDTH
+app.jinja_env.globals['CAST_PROGRESS_REFRESH'] = config.CAST_PROGRESS_REFRESH
+template_cache_dir = Path(environ.get('TEMPLATE_CACHE_DIR', config.TEMPLATE_CACHE_DIR)).resolve()
+template_cache_dir.mkdir(parents=True, exist_ok=True)
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(str(template_cache_dir))
+fragment_cache = fragments.FragmentCache(app.jinja_env, config.FRAGMENT_CACHE_SIZE)
+app.jinja_env.globals['film_card'] = partial(
+    fragment_cache.render, '_film_card.html', fragments.FILM_CARD_FIELDS,
+)
+app.jinja_env.globals['actor_card'] = partial(
+    fragment_cache.render, '_actor_card.html', fragments.ACTOR_CARD_FIELDS,
+)
 engine = db.engine
+image_cache_dir = Path(environ.get('IMAGE_CACHE_DIR', config.IMAGE_CACHE_DIR)).resolve()
 
 
 class AddFilmForm(FlaskForm):
     """Form for adding a new film."""
 
     imdb_id = StringField('Enter the film imdb_id: ')
+    cast_depth = IntegerField(
+        'Number of actors (empty for the full cast): ',
+        default=config.DEFAULT_CAST_DEPTH,
+        validators=[Optional(), NumberRange(min=1)],
+    )
     submit = SubmitField('Submit')
 
 
-db_session = db.Session(engine)
+snapshots = None
+if environ.get('SNAPSHOT_MODE', 'false').lower() == 'true':
+    snapshots = snapshot.SnapshotStore(
+        Path(environ.get('SNAPSHOT_PATH', config.SNAPSHOT_PATH)), config.SNAPSHOT_CHECK_INTERVAL,
+    )
+group_committer = None
+if environ.get('GROUP_COMMIT', 'false').lower() == 'true':
+    group_committer = group_commit.GroupCommitter(
+        engine,
+        float(environ.get('GROUP_COMMIT_WINDOW_MS', config.GROUP_COMMIT_WINDOW_MS)) / 1000,
+        int(environ.get('GROUP_COMMIT_MAX_BATCH', config.GROUP_COMMIT_MAX_BATCH)),
+    )
+if environ.get('QUERY_COUNT_HEADER', 'false').lower() == 'true':
+    for counted_engine in (engine, *db.replicas.replicas):
+        query_counter.install(counted_engine)
+    app.before_request(query_counter.start_request)
+    app.after_request(query_counter.finish_request)
+
+
+def catalogue(session: db.Session):
+    """
+    Choose where GET routes read the catalogue from.
+
+    Args:
+        session (Session): The current database session.
+
+    Returns:
+        The current snapshot in snapshot mode, otherwise the db module.
+    """
+    if snapshots is None:
+        return db
+    return snapshots.current(session)
+
+
+def find_in_catalogue(session: db.Session, getter: str, record_id: UUID) -> tuple:
+    """
+    Read a film or an actor, falling back to the database when the snapshot misses it.
+
+    The snapshot may be up to SNAPSHOT_CHECK_INTERVAL behind the database, \
+        e.g. for the film that add_film has just redirected to.
+
+    Args:
+        session (Session): The current database session.
+        getter (str): The reader method, 'get_film' or 'get_actor'.
+        record_id (UUID): The id of the film or the actor.
+
+    Returns:
+        tuple: The reader that found the record and the record, None if it does not exist.
+    """
+    reader = catalogue(session)
+    record = getattr(reader, getter)(record_id, session)
+    if record is None and reader is not db:
+        reader = db
+        record = getattr(db, getter)(record_id, session)
+    return reader, record
+
+
+def writing_session() -> db.Session:
+    """
+    Open the session of a request on the primary.
+
+    Every request gets its own session, so the threads of a worker never share one.
+
+    Returns:
+        Session: A session on the primary.
+    """
+    return db.Session(engine)
+
+
+def reading_session() -> db.Session:
+    """
+    Open the session for a GET route.
+
+    Browsers that wrote within READ_AFTER_WRITE_WINDOW seconds read from the primary,
+    so they see their own writes before the replicas have replayed them.
+
+    Returns:
+        Session: A session on a read replica, or on the primary after a recent write.
+    """
+    if browser_session.get('primary_until', 0) > time.time():
+        return writing_session()
+    return db.read_session()
+
+
+def remember_write() -> None:
+    """Keep the reads of this browser on the primary for READ_AFTER_WRITE_WINDOW seconds."""
+    browser_session['primary_until'] = time.time() + config.READ_AFTER_WRITE_WINDOW
+
+
+@app.template_filter('thumbnail')
+def thumbnail(url: str | None, width: int = config.THUMBNAIL_WIDTH) -> str | None:
+    """
+    Replace a remote image URL with a signed URL of the image proxy.
+
+    Args:
+        url (str | None): The remote image URL.
+        width (int): The thumbnail width.
+
+    Returns:
+        str | None: The proxied image URL or the original value if it is empty.
+    """
+    if not url:
+        return url
+    signature = images.sign_url(url, width, app.config['SECRET_KEY'])
+    return url_for('image', signature=signature, url=url, width=width)
 
 
 @app.route('/')
@@ -39,8 +183,8 @@ def homepage():
     Returns:
         A rendered template of index.html with all films data.
     """
-    with db_session as session:
-        films = {'films': db.get_all_films(session)}
+    with reading_session() as session:
+        films = {'films': catalogue(session).get_all_films(session)}
     return render_template('index.html', **films), config.OK
 
 
@@ -53,13 +197,20 @@ def film(film_id: UUID):
         film_id (UUID): The unique identifier for the film.
 
     Returns:
-        A rendered template of film.html with the film's data and its actors.
+        A rendered template of film.html with the film's data, its imported actors, \
+            the progress of the cast import and the similar films.
     """
-    with db_session as session:
-        film_data = db.get_film(film_id, session)
-        actors = db.get_film_actors(film_data['id'], session)
+    with reading_session() as session:
+        reader, film_data = find_in_catalogue(session, 'get_film', film_id)
+        if film_data is None:
+            return '', config.NOT_FOUND
+        actors = reader.get_film_actors(film_data['id'], session)
+        progress = cast_import.get_progress(film_data['id'], session)
+        similar_films = recommendations.get_similar_films(film_data['id'], session)
     film_actors = {
         'actors': actors,
+        'progress': progress,
+        'similar_films': similar_films,
     }
     return render_template('film.html', **film_actors), config.OK
 
@@ -77,14 +228,282 @@ def actor(actor_id: UUID):
             and an HTTP status code indicating success. \
                 The template displays detailed information about the specified actor.
     """
-    with db_session as session:
-        actor_info = db.get_actor(actor_id, session)
+    with reading_session() as session:
+        _, actor_info = find_in_catalogue(session, 'get_actor', actor_id)
+    if actor_info is None:
+        return '', config.NOT_FOUND
     actor_data = {
         'actor': actor_info,
     }
     return render_template('actor.html', **actor_data), config.OK
 
 
+@app.errorhandler(json_api.UnknownFieldsError)
+def unknown_fields(error: json_api.UnknownFieldsError):
+    """
+    Reject a JSON API request selecting fields the resource does not have.
+
+    Args:
+        error (UnknownFieldsError): The raised error.
+
+    Returns:
+        JSON with the error message and the bad request status code.
+    """
+    return {'error': str(error)}, config.BAD_REQUEST
+
+
+@app.route('/api/films')
+def api_films():
+    """
+    List all films as JSON.
+
+    Query args: fields (comma-separated columns to return).
+
+    Returns:
+        A compressed, revalidatable JSON list of films.
+    """
+    fields = json_api.requested_fields(request.args.get('fields'), json_api.FILM_FIELDS)
+    with reading_session() as session:
+        films = catalogue(session).get_all_films(session)
+    return json_api.json_response([json_api.pick(film, fields) for film in films], request)
+
+
+@app.route('/api/films/<uuid:film_id>')
+def api_film(film_id: UUID):
+    """
+    Return a film with its cast as JSON.
+
+    Query args: fields (comma-separated columns to return, 'cast' for the cast).
+
+    Args:
+        film_id (UUID): The unique identifier for the film.
+
+    Returns:
+        A compressed, revalidatable JSON film, otherwise the not found status code.
+    """
+    fields = json_api.requested_fields(request.args.get('fields'), json_api.FILM_DETAIL_FIELDS)
+    with reading_session() as session:
+        reader, film_data = find_in_catalogue(session, 'get_film', film_id)
+        if film_data is None:
+            return {'error': 'Film not found'}, config.NOT_FOUND
+        film_json = json_api.pick(film_data, fields)
+        if 'cast' in fields:
+            film_json['cast'] = [
+                json_api.pick(cast_actor, json_api.CAST_FIELDS)
+                for cast_actor in reader.get_film_actors(film_id, session) or []
+            ]
+    return json_api.json_response(film_json, request)
+
+
+@app.route('/api/films/<uuid:film_id>/similar')
+def api_similar_films(film_id: UUID):
+    """
+    Return the precomputed films most similar to a film as JSON.
+
+    Args:
+        film_id (UUID): The unique identifier for the film.
+
+    Returns:
+        A compressed, revalidatable JSON list of films with their score, the most similar first.
+    """
+    with reading_session() as session:
+        similar_films = recommendations.get_similar_films(film_id, session)
+    return json_api.json_response(similar_films, request)
+
+
+@app.route('/api/actors')
+def api_actors():
+    """
+    List all actors as JSON.
+
+    Query args: fields (comma-separated columns to return).
+
+    Returns:
+        A compressed, revalidatable JSON list of actors.
+    """
+    fields = json_api.requested_fields(request.args.get('fields'), json_api.ACTOR_FIELDS)
+    with reading_session() as session:
+        actors = catalogue(session).get_all_actors(session)
+    return json_api.json_response(
+        [json_api.pick(actor_data, fields) for actor_data in actors], request,
+    )
+
+
+@app.route('/api/actors/<uuid:actor_id>')
+def api_actor(actor_id: UUID):
+    """
+    Return an actor as JSON.
+
+    Query args: fields (comma-separated columns to return).
+
+    Args:
+        actor_id (UUID): The unique identifier of the actor.
+
+    Returns:
+        A compressed, revalidatable JSON actor, otherwise the not found status code.
+    """
+    fields = json_api.requested_fields(request.args.get('fields'), json_api.ACTOR_FIELDS)
+    with reading_session() as session:
+        _, actor_data = find_in_catalogue(session, 'get_actor', actor_id)
+    if actor_data is None:
+        return {'error': 'Actor not found'}, config.NOT_FOUND
+    return json_api.json_response(json_api.pick(actor_data, fields), request)
+
+
+@app.route('/image/<signature>')
+def image(signature: str):
+    """
+    Serve a cached thumbnail of a remote poster or photo.
+
+    Args:
+        signature (str): The signature of the URL and width made by the thumbnail filter.
+
+    Returns:
+        The thumbnail with long-lived cache headers, \
+            otherwise an error status code.
+    """
+    url = request.args.get('url', '')
+    width = request.args.get('width', config.THUMBNAIL_WIDTH, type=int)
+    expected = images.sign_url(url, width, app.config['SECRET_KEY'])
+    if not hmac.compare_digest(expected, signature):
+        return '', config.FORBIDDEN
+    try:
+        digest, thumbnail_bytes = images.get_thumbnail(url, width, image_cache_dir)
+    except images.ImageFetchError:
+        return '', config.BAD_GATEWAY
+    response = send_file(
+        io.BytesIO(thumbnail_bytes),
+        mimetype='image/jpeg',
+        etag=digest,
+        max_age=config.IMAGE_MAX_AGE,
+    )
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
+
+@app.route('/changes')
+def changes_feed():
+    """
+    Serve the change-data feed of catalogue writes after a cursor.
+
+    Query args: cursor (the last seen change id), limit, \
+        and wait (seconds to long-poll when there are no changes yet).
+
+    Returns:
+        JSON with the changes in commit order and the cursor for the next request.
+    """
+    cursor = request.args.get('cursor', 0, type=int)
+    limit = request.args.get('limit', config.CHANGES_PAGE_SIZE, type=int)
+    wait = request.args.get('wait', 0, type=float)
+    with writing_session() as session:
+        log = changes.wait_for_changes(
+            session,
+            cursor,
+            max(min(limit, config.CHANGES_PAGE_SIZE), 1),
+            max(min(wait, config.CHANGES_MAX_WAIT), 0),
+        )
+    next_cursor = log[-1]['id'] if log else cursor
+    return {'changes': log, 'cursor': next_cursor}, config.OK
+
+
+@app.cli.command('compile-templates')
+def compile_templates():
+    """Compile every template into the bytecode cache shared by the workers."""
+    template_names = app.jinja_env.list_templates()
+    for template_name in template_names:
+        app.jinja_env.get_template(template_name)
+    compiled_count = len(template_names)
+    click.echo(f'Compiled {compiled_count} templates into {template_cache_dir}')
+
+
+@app.cli.command('compact-changes')
+@click.option('--days', default=config.CHANGES_RETENTION_DAYS, show_default=True)
+def compact_changes(days: int):
+    """
+    Compact the change log entries older than the given number of days.
+
+    Args:
+        days (int): The retention period in days.
+    """
+    with writing_session() as session:
+        removed = changes.compact(session, timedelta(days=days))
+    click.echo(f'Removed {removed} change log entries')
+
+
+@app.cli.command('refresh')
+@click.option('--batch-size', default=config.REFRESH_BATCH_SIZE, show_default=True)
+@click.option('--workers', default=config.REFRESH_WORKERS, show_default=True)
+@click.option('--every', default=0, help='Repeat every N seconds, 0 runs once.')
+def refresh_catalogue(batch_size: int, workers: int, every: int):
+    """
+    Re-sync the stalest films and actors from the external API.
+
+    Args:
+        batch_size (int): The maximum number of rows to refresh per table and run.
+        workers (int): The maximum number of concurrent API calls.
+        every (int): The pause between runs in seconds, 0 runs once.
+    """
+    while True:
+        with writing_session() as session:
+            report = refresh.refresh(session, batch_size, workers)
+        for table, stats in report.items():
+            summary = '{checked} checked, {changed} changed, {failed} failed'.format(**stats)
+            click.echo(f'{table}: {summary}, {stats["rows_per_second"]:.1f} rows/s')
+        if not every:
+            break
+        time.sleep(every)
+
+
+@app.cli.command('resume-cast-imports')
+def resume_cast_imports():
+    """Finish the cast imports interrupted by a restart or an error."""
+    with writing_session() as session:
+        resumed = cast_import.resume(session)
+    click.echo(f'Resumed {resumed} cast imports')
+
+
+@app.cli.command('rebuild-similar')
+@click.option('--year-weight', default=config.SIMILAR_YEAR_WEIGHT, show_default=True)
+@click.option('--country-weight', default=config.SIMILAR_COUNTRY_WEIGHT, show_default=True)
+def rebuild_similar(year_weight: float, country_weight: float):
+    """
+    Recompute the similar films of every film.
+
+    Args:
+        year_weight (float): The score bonus for films of the same year, 0 to ignore years.
+        country_weight (float): The score bonus for films of the same country, 0 to ignore it.
+    """
+    with writing_session() as session:
+        report = recommendations.rebuild(session, (year_weight, country_weight))
+    films_per_second = report['films'] / report['seconds'] if report['seconds'] else 0
+    summary = '{films} films, {pairs} pairs in {seconds:.2f} s'.format(**report)
+    click.echo(f'{summary}, {films_per_second:.1f} films/s')
+
+
+@app.cli.command('update-similar')
+@click.option('--year-weight', default=config.SIMILAR_YEAR_WEIGHT, show_default=True)
+@click.option('--country-weight', default=config.SIMILAR_COUNTRY_WEIGHT, show_default=True)
+@click.option('--every', default=0, help='Repeat every N seconds, 0 runs once.')
+def update_similar(year_weight: float, country_weight: float, every: int):
+    """
+    Recompute the similar films of the films affected by the changes since the last run.
+
+    Args:
+        year_weight (float): The score bonus for films of the same year, 0 to ignore years.
+        country_weight (float): The score bonus for films of the same country, 0 to ignore it.
+        every (int): The pause between runs in seconds, 0 runs once.
+    """
+    while True:
+        with writing_session() as session:
+            report = recommendations.update(session, (year_weight, country_weight))
+        summary = '{changes} changes, {films} films recomputed'.format(**report)
+        click.echo(f'{summary} in {report["seconds"]:.2f} s')
+        if not every:
+            break
+        time.sleep(every)
+
+
 @app.route('/add_film', methods=['GET', 'POST'])
 def add_film():
     """
@@ -99,10 +518,11 @@ def add_film():
     flag = False
     film_id = None
     if form.validate_on_submit():
-        with db_session as session:
-            film_id = db.add_film_api(form.imdb_id.data, session)
+        with writing_session() as session:
+            film_id = db.add_film_api(form.imdb_id.data, session, form.cast_depth.data)
         flag = True
     if film_id:
+        remember_write()
         return redirect(f'/film/{film_id}')
     if flag:
         msg = 'The film was not found, check the correctness of the entered imdb_id'
@@ -115,6 +535,9 @@ def create_model(model: str):
     """
     Create a new record based on the provided model.
 
+    With GROUP_COMMIT=true the record is committed together with the records \
+        created by concurrent requests within GROUP_COMMIT_WINDOW_MS.
+
     Args:
         model (str): The type of record to create ('film' or 'actor').
 
@@ -127,12 +550,16 @@ def create_model(model: str):
         'actor': db.add_actor,
         'film_to_actor': db.add_film_to_actor,
     }
-    if model in functions.keys():
-        with db_session as session:
-            res = functions[model](body, session)
-    else:
+    models = {'film': Film, 'actor': Actor, 'film_to_actor': FilmToActor}
+    if model not in functions.keys():
         return '', config.NOT_FOUND
+    if group_committer:
+        res = group_committer.submit(models[model], body)
+    else:
+        with writing_session() as session:
+            res = functions[model](body, session)
     if res:
+        remember_write()
         return str(res), config.CREATED
     return '', config.BAD_REQUEST
 
@@ -155,11 +582,12 @@ def update_model(model: str):
         'film_to_actor': db.update_film_to_actor,
     }
     if model in functions.keys():
-        with db_session as session:
+        with writing_session() as session:
             res = functions[model](body, session)
     else:
         return '', config.NOT_FOUND
     if res:
+        remember_write()
         return str(res), config.OK
     return '', config.BAD_REQUEST
 
@@ -182,11 +610,12 @@ def delete_model(model: str):
         'film_to_actor': db.delete_film_to_actor,
     }
     if model in functions.keys():
-        with db_session as session:
+        with writing_session() as session:
             res = functions[model](body['id'], session)
     else:
         return '', config.NOT_FOUND
     if res:
+        remember_write()
         return '', config.NO_CONTENT
     return '', config.BAD_REQUEST
 
@@ -0,0 +1,142 @@
+"""Benchmark of concurrent single-record creates with one commit per row against group commits.
+
+Creates actors from concurrent threads in scratch tables of the configured database:
+python bench_group_commit.py --threads 32 --writes 50 --windows 1,5,20
+"""
+
+
+import argparse
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+import config
+import db
+import group_commit
+from models import Actor, Base, CatalogueVersion
+
+SCHEMA = 'bench_group_commit'
+
+
+def per_row(scratch: Engine):
+    """
+    Create a write function committing every actor on its own, like create_add.
+
+    Args:
+        scratch (Engine): The engine of the scratch tables.
+
+    Returns:
+        A function creating an actor from its column values.
+    """
+    def write(actor_data: dict) -> None:  # noqa: WPS430
+        with Session(scratch) as session:
+            db.add_actor(actor_data, session)
+    return write
+
+
+def grouped(scratch: Engine, window: float, max_batch: int):
+    """
+    Create a write function committing the actors through a group committer.
+
+    Args:
+        scratch (Engine): The engine of the scratch tables.
+        window (float): The group commit window, in seconds.
+        max_batch (int): The maximum number of writes per group commit.
+
+    Returns:
+        A function creating an actor from its column values.
+    """
+    committer = group_commit.GroupCommitter(scratch, window, max_batch)
+    return lambda actor_data: committer.submit(Actor, actor_data)
+
+
+def run(scratch: Engine, write, threads: int, writes: int) -> dict:
+    """
+    Create actors from concurrent threads and count the commits.
+
+    Args:
+        scratch (Engine): The engine of the scratch tables.
+        write: The function creating an actor.
+        threads (int): The number of concurrent writers.
+        writes (int): The number of actors per writer.
+
+    Returns:
+        dict: The rows and commits per second and the mean and p99 write latency in ms.
+    """
+    commits = []
+    latencies = []
+
+    def count_commit(connection) -> None:  # noqa: WPS430
+        commits.append(connection)
+
+    def timed_writes(writer: int) -> None:  # noqa: WPS430
+        for number in range(writes):
+            started = time.perf_counter()
+            write({'full_name': f'Actor {writer}-{number}'})
+            latencies.append((time.perf_counter() - started) * 1000)
+
+    event.listen(scratch, 'commit', count_commit)
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(timed_writes, range(threads)))
+    elapsed = time.perf_counter() - started
+    event.remove(scratch, 'commit', count_commit)
+    latencies.sort()
+    return {
+        'rows': len(latencies) / elapsed,
+        'commits': len(commits) / elapsed,
+        'mean': statistics.mean(latencies),
+        'p99': latencies[int(len(latencies) * 0.99)],
+    }
+
+
+def execute(statement: str) -> None:
+    """
+    Execute a statement on the configured database and commit it.
+
+    Args:
+        statement (str): The SQL statement.
+    """
+    with db.engine.connect() as connection:
+        connection.execute(text(statement))
+        connection.commit()
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--writes', type=int, default=50)
+    parser.add_argument('--windows', default='1,5,20')
+    parser.add_argument('--max-batch', type=int, default=config.GROUP_COMMIT_MAX_BATCH)
+    args = parser.parse_args()
+
+    execute(f'CREATE SCHEMA IF NOT EXISTS {SCHEMA}')
+    scratch = db.engine.execution_options(schema_translate_map={None: SCHEMA})
+    Base.metadata.create_all(scratch)
+    with Session(scratch) as session:
+        session.add(CatalogueVersion(version=0))
+        session.commit()
+
+    modes = [('per row', per_row(scratch))]
+    for window in args.windows.split(','):
+        modes.append((
+            f'group {window} ms', grouped(scratch, float(window) / 1000, args.max_batch),
+        ))
+    for label, write in modes:
+        report = run(scratch, write, args.threads, args.writes)
+        rows, commits = report['rows'], report['commits']
+        mean, p99 = report['mean'], report['p99']
+        print(f'{label}:')
+        print(f'  {rows:8.0f} rows/s, {commits:8.0f} commits/s')
+        print(f'  latency mean {mean:7.2f} ms, p99 {p99:7.2f} ms')
+
+    execute(f'DROP SCHEMA {SCHEMA} CASCADE')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+"""Benchmark of film_to_actor index size and lookup latency, plain against hash-partitioned.
+
+Builds both layouts with synthetic links in a scratch schema of the configured database:
+python bench_partitioning.py --films 100000 --cast 20 --partitions 16
+"""
+
+
+import argparse
+import re
+import time
+
+from sqlalchemy import Connection, text
+
+from db import engine
+
+SCHEMA = 'bench_partitioning'
+PLAIN = f'{SCHEMA}.links_plain'
+PARTITIONED = f'{SCHEMA}.links_partitioned'
+LOOKUP = 'SELECT actor_id, character FROM {table} WHERE film_id = :film_id'
+
+
+def create_tables(connection: Connection, partitions: int) -> None:
+    """
+    Create the layout before and after the migration.
+
+    Before: a primary key on id only, as the table was created by the first migration.
+    After: hash partitions by film_id with a primary key on (film_id, id)
+    and an index on actor_id, as the partitioning migration creates them.
+
+    Args:
+        connection (Connection): The database connection.
+        partitions (int): The number of hash partitions.
+    """
+    connection.execute(text(f'DROP SCHEMA IF EXISTS {SCHEMA} CASCADE'))
+    connection.execute(text(f'CREATE SCHEMA {SCHEMA}'))
+    columns = 'id uuid NOT NULL, actor_id uuid, character varchar'
+    connection.execute(text(
+        f'CREATE TABLE {PLAIN} (film_id uuid, {columns}, PRIMARY KEY (id))',
+    ))
+    connection.execute(text(
+        f'CREATE TABLE {PARTITIONED} (film_id uuid NOT NULL, {columns}, '
+        'PRIMARY KEY (film_id, id)) PARTITION BY HASH (film_id)',
+    ))
+    for remainder in range(partitions):
+        connection.execute(text(
+            f'CREATE TABLE {PARTITIONED}_p{remainder} PARTITION OF {PARTITIONED} '
+            f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})',
+        ))
+    connection.execute(text(f'CREATE INDEX ON {PARTITIONED} (actor_id)'))
+
+
+def fill(connection: Connection, films_count: int, cast_size: int) -> None:
+    """
+    Fill both tables with the same synthetic links.
+
+    Args:
+        connection (Connection): The database connection.
+        films_count (int): The number of films.
+        cast_size (int): The number of actors per film.
+    """
+    films = text(
+        f'CREATE TABLE {SCHEMA}.films AS '
+        'SELECT gen_random_uuid() AS id FROM generate_series(1, :films_count)',
+    )
+    connection.execute(films, {'films_count': films_count})
+    links = text(
+        f'INSERT INTO {PLAIN} SELECT films.id, gen_random_uuid(), gen_random_uuid(), '
+        f"'Character ' || cast_position FROM {SCHEMA}.films, "
+        'generate_series(1, :cast_size) AS cast_position',
+    )
+    connection.execute(links, {'cast_size': cast_size})
+    connection.execute(text(f'INSERT INTO {PARTITIONED} SELECT * FROM {PLAIN}'))
+    connection.execute(text(f'ANALYZE {PLAIN}'))
+    connection.execute(text(f'ANALYZE {PARTITIONED}'))
+
+
+def sizes(connection: Connection, table: str) -> tuple[int, int]:
+    """
+    Measure a table with all its partitions.
+
+    Args:
+        connection (Connection): The database connection.
+        table (str): The qualified table name.
+
+    Returns:
+        tuple[int, int]: The index bytes and the largest single index in bytes.
+    """
+    query = text(
+        'SELECT sum(pg_relation_size(indexrelid)), max(pg_relation_size(indexrelid)) '
+        'FROM pg_index WHERE indrelid IN (SELECT relid FROM pg_partition_tree(:table))',
+    )
+    return connection.execute(query, {'table': table}).one()
+
+
+def lookup_latency(connection: Connection, table: str, film_ids: list) -> float:
+    """
+    Time the cast lookups of the films.
+
+    Args:
+        connection (Connection): The database connection.
+        table (str): The qualified table name.
+        film_ids (list): The films to look up.
+
+    Returns:
+        float: The mean latency in milliseconds.
+    """
+    query = text(LOOKUP.format(table=table))
+    started = time.perf_counter()
+    for film_id in film_ids:
+        connection.execute(query, {'film_id': film_id}).all()
+    return (time.perf_counter() - started) * 1000 / len(film_ids)
+
+
+def scanned_partitions(connection: Connection, film_id) -> int:
+    """
+    Count the partitions the planner keeps for a cast lookup.
+
+    Args:
+        connection (Connection): The database connection.
+        film_id: The film to look up.
+
+    Returns:
+        int: The number of scanned partitions.
+    """
+    plan = connection.execute(
+        text(f'EXPLAIN {LOOKUP.format(table=PARTITIONED)}'), {'film_id': film_id},
+    ).scalars().all()
+    return len({
+        partition for line in plan for partition in re.findall(r'links_partitioned_p\d+', line)
+    })
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, default=100000)
+    parser.add_argument('--cast', type=int, default=20)
+    parser.add_argument('--partitions', type=int, default=16)
+    parser.add_argument('--lookups', type=int, default=1000)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        create_tables(connection, args.partitions)
+        fill(connection, args.films, args.cast)
+        connection.commit()
+        sample = text(f'SELECT id FROM {SCHEMA}.films ORDER BY random() LIMIT :lookups')
+        film_ids = connection.execute(sample, {'lookups': args.lookups}).scalars().all()
+        print(f'{args.films * args.cast} links, {args.partitions} partitions')
+        for label, table in (('plain', PLAIN), ('partitioned', PARTITIONED)):
+            total, largest = (size / 2 ** 20 for size in sizes(connection, table))
+            latency = lookup_latency(connection, table, film_ids)
+            print(f'{label:12} indexes {total:9.2f} MiB')
+            print(f'{label:12} largest {largest:9.2f} MiB')
+            print(f'{label:12} lookup  {latency:9.3f} ms')
+        print(f'partitions scanned per lookup: {scanned_partitions(connection, film_ids[0])}')
+        connection.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+        connection.commit()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""Benchmark of the catalogue snapshot memory footprint against the ORM representation.
+
+Run with synthetic rows: python bench_snapshot.py --films 10000
+Run against the configured database: python bench_snapshot.py --from-db
+"""
+
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+import uuid
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import select
+
+import snapshot
+from models import Actor, Film, FilmToActor
+
+CAST_SIZE = 10
+COUNTRIES = ('USA', 'UK', 'France', 'Japan')
+
+
+def synthetic_rows(films_count: int) -> tuple[list, list, list]:
+    """
+    Generate film, actor and film_to_actor rows shaped like imported data.
+
+    Args:
+        films_count (int): The number of films; every film gets CAST_SIZE actors.
+
+    Returns:
+        tuple[list, list, list]: The films, actors and links rows.
+    """
+    films = [
+        (
+            uuid.uuid4(),
+            f'tt{number:07}',
+            f'Film {number}',
+            7.5,
+            2000,
+            f'https://example.com/posters/{number}.jpg',
+            COUNTRIES[number % len(COUNTRIES)],
+        )
+        for number in range(films_count)
+    ]
+    actors = [
+        (
+            uuid.uuid4(),
+            f'nm{number:07}',
+            f'Actor {number}',
+            '1.80 m',
+            f'https://example.com/photos/{number}.jpg',
+            date.today(),
+            'USA',
+        )
+        for number in range(films_count * CAST_SIZE // 2)
+    ]
+    actor_ids = [actor[0] for actor in actors]
+    links = [
+        (film[0], actor_ids[(position * CAST_SIZE // 2 + cast) % len(actor_ids)], 'Himself')
+        for position, film in enumerate(films)
+        for cast in range(CAST_SIZE)
+    ]
+    return films, actors, links
+
+
+def measure(load) -> tuple[object, int]:
+    """
+    Measure the memory allocated by a loader while keeping its result alive.
+
+    Args:
+        load: A function without arguments.
+
+    Returns:
+        tuple[object, int]: The loaded object and the allocated bytes.
+    """
+    tracemalloc.start()
+    loaded = load()
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return loaded, allocated
+
+
+def orm_objects(films: list, actors: list, links: list) -> list:
+    """
+    Build ORM instances equivalent to the rows.
+
+    Args:
+        films (list): The films rows.
+        actors (list): The actors rows.
+        links (list): The film_to_actor rows.
+
+    Returns:
+        list: The ORM instances.
+    """
+    film_fields = ['id'] + [field for field, _ in snapshot.FILM_FIELDS]
+    actor_fields = ['id'] + [field for field, _ in snapshot.ACTOR_FIELDS]
+    instances = [Film(**dict(zip(film_fields, film))) for film in films]
+    instances.extend(Actor(**dict(zip(actor_fields, actor))) for actor in actors)
+    instances.extend(
+        FilmToActor(film_id=film_id, actor_id=actor_id, character=character)
+        for film_id, actor_id, character in links
+    )
+    return instances
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, default=10000)
+    parser.add_argument('--from-db', action='store_true')
+    args = parser.parse_args()
+
+    if args.from_db:
+        from db import Session, engine  # noqa: WPS433
+        with Session(engine) as session:
+            _, orm_bytes = measure(lambda: [
+                session.scalars(select(model)).all() for model in (Film, Actor, FilmToActor)
+            ])
+        path = Path(tempfile.mkdtemp()) / 'catalogue.snapshot'
+        with Session(engine) as build_session:
+            snapshot.build_snapshot(build_session, path)
+    else:
+        films, actors, links = synthetic_rows(args.films)
+        _, orm_bytes = measure(lambda: orm_objects(films, actors, links))
+        path = Path(tempfile.mkdtemp()) / 'catalogue.snapshot'
+        snapshot.write_snapshot(path, 0, films, actors, links)
+
+    catalogue, private_bytes = measure(lambda: snapshot.Snapshot(path))
+    started = time.perf_counter()
+    catalogue.get_all_films()
+    elapsed = time.perf_counter() - started
+    print(f'ORM representation per worker:   {orm_bytes / 2 ** 20:8.2f} MiB')
+    print(f'Snapshot file, shared per host:  {path.stat().st_size / 2 ** 20:8.2f} MiB')
+    print(f'Snapshot private per worker:     {private_bytes / 2 ** 10:8.2f} KiB')
+    print(f'Snapshot get_all_films:          {elapsed * 1000:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
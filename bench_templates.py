@@ -0,0 +1,133 @@
+"""Benchmark of page rendering with and without the card fragment cache and the bytecode cache.
+
+Run with synthetic films: python bench_templates.py --items 10000
+"""
+
+
+import argparse
+import tempfile
+import time
+import uuid
+from functools import partial
+
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+
+import fragments
+from app import app
+
+COUNTRIES = ('USA', 'UK', 'France', 'Japan')
+PAGES = (
+    ('index.html', 'films', 'film_card', fragments.FILM_CARD_FIELDS),
+    ('film.html', 'actors', 'actor_card', fragments.ACTOR_CARD_FIELDS),
+)
+
+
+def synthetic_items(items_count: int) -> dict[str, list]:
+    """
+    Generate films and cast members shaped like the page data.
+
+    Args:
+        items_count (int): The number of films and of cast members.
+
+    Returns:
+        dict[str, list]: The films and the actors, by template variable.
+    """
+    films = [
+        {
+            'id': str(uuid.uuid4()),
+            'imdb_id': f'tt{number:07}',
+            'title': f'Film {number}',
+            'year': 2000,
+            'country': COUNTRIES[number % len(COUNTRIES)],
+            'imdb_rating': 7.5,
+            'poster': f'https://example.com/posters/{number}.jpg',
+        }
+        for number in range(items_count)
+    ]
+    actors = [
+        {
+            'id': str(uuid.uuid4()),
+            'photo': f'https://example.com/photos/{number}.jpg',
+            'character': f'Character {number}',
+        }
+        for number in range(items_count)
+    ]
+    return {'films': films, 'actors': actors}
+
+
+def render_page(page: tuple, entities: list, cache: fragments.FragmentCache) -> float:
+    """
+    Render a page with its cards rendered through a fragment cache.
+
+    Args:
+        page (tuple): The page template, its entities variable, its card global and card fields.
+        entities (list): The entities shown as cards.
+        cache (FragmentCache): The fragment cache to render the cards with.
+
+    Returns:
+        float: The render time in seconds.
+    """
+    template_name, entities_name, card, fields = page
+    context = {
+        entities_name: entities,
+        card: partial(cache.render, f'_{card}.html', fields),
+        'progress': {'imported': len(entities), 'total': len(entities)},
+    }
+    template = app.jinja_env.get_template(template_name)
+    started = time.perf_counter()
+    template.render(**context)
+    return time.perf_counter() - started
+
+
+def compile_time(bytecode_cache) -> float:
+    """
+    Measure loading every template into a fresh environment.
+
+    Args:
+        bytecode_cache: The bytecode cache of the environment, None to compile from source.
+
+    Returns:
+        float: The load time in seconds.
+    """
+    environment = Environment(
+        loader=FileSystemLoader(app.template_folder),
+        bytecode_cache=bytecode_cache,
+        autoescape=True,
+    )
+    environment.filters.update(app.jinja_env.filters)
+    started = time.perf_counter()
+    for template_name in environment.list_templates():
+        environment.get_template(template_name)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--items', type=int, default=10000)
+    args = parser.parse_args()
+
+    synthetic = synthetic_items(args.items)
+    with app.test_request_context():
+        for page in PAGES:
+            entities = synthetic[page[1]]
+            uncached = fragments.FragmentCache(app.jinja_env, 0)
+            cached = fragments.FragmentCache(app.jinja_env, args.items)
+            before = render_page(page, entities, uncached)
+            cold = render_page(page, entities, cached)
+            warm = render_page(page, entities, cached)
+            print(f'{page[0]} with {args.items} cards:')
+            print(f'  without fragment cache:  {before * 1000:9.2f} ms')
+            print(f'  cold fragment cache:     {cold * 1000:9.2f} ms')
+            print(f'  warm fragment cache:     {warm * 1000:9.2f} ms')
+
+    bytecode_cache = FileSystemBytecodeCache(tempfile.mkdtemp())
+    from_source = compile_time(None)
+    compile_time(bytecode_cache)
+    from_bytecode = compile_time(bytecode_cache)
+    print(f'Templates compiled from source:  {from_source * 1000:9.2f} ms')
+    print(f'Templates loaded from bytecode:  {from_bytecode * 1000:9.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
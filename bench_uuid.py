@@ -0,0 +1,135 @@
+"""Benchmark of insert throughput and primary key index size with UUIDv4 against UUIDv7 ids.
+
+Inserts synthetic films, actors and film_to_actor rows into scratch tables of the
+configured database: python bench_uuid.py --films 100000 --cast 10
+"""
+
+
+import argparse
+import time
+import uuid
+
+from sqlalchemy import Column, Connection, MetaData, String, Table, Uuid, text
+
+from db import engine
+from models import uuid7
+
+SCHEMA = 'bench_uuid'
+BATCH_SIZE = 5000
+GENERATORS = (('v4', uuid.uuid4), ('v7', uuid7))
+
+metadata = MetaData(schema=SCHEMA)
+films = Table(
+    'films',
+    metadata,
+    Column('id', Uuid, primary_key=True),
+    Column('title', String),
+)
+actors = Table(
+    'actors',
+    metadata,
+    Column('id', Uuid, primary_key=True),
+    Column('full_name', String),
+)
+film_to_actor = Table(
+    'film_to_actor',
+    metadata,
+    Column('film_id', Uuid, primary_key=True),
+    Column('id', Uuid, primary_key=True),
+    Column('actor_id', Uuid),
+)
+
+
+def insert(connection: Connection, table: Table, rows: list) -> float:
+    """
+    Insert rows in batches, committing every batch like a bulk import.
+
+    Args:
+        connection (Connection): The database connection.
+        table (Table): The table.
+        rows (list): The rows as dicts.
+
+    Returns:
+        float: The rows inserted per second.
+    """
+    started = time.perf_counter()
+    for start in range(0, len(rows), BATCH_SIZE):
+        connection.execute(table.insert(), rows[start:start + BATCH_SIZE])
+        connection.commit()
+    return len(rows) / (time.perf_counter() - started)
+
+
+def index_size(connection: Connection, table: Table) -> int:
+    """
+    Measure the primary key index of a table.
+
+    Args:
+        connection (Connection): The database connection.
+        table (Table): The table.
+
+    Returns:
+        int: The index size in bytes.
+    """
+    query = text('SELECT pg_relation_size(:index)')
+    return connection.execute(query, {'index': f'{SCHEMA}.{table.name}_pkey'}).scalar()
+
+
+def run(connection: Connection, generate, films_count: int, cast_size: int) -> dict:
+    """
+    Fill the scratch tables with ids from one generator.
+
+    Args:
+        connection (Connection): The database connection.
+        generate: uuid.uuid4 or models.uuid7.
+        films_count (int): The number of films.
+        cast_size (int): The number of actors per film.
+
+    Returns:
+        dict: The rows per second and the index bytes per table.
+    """
+    metadata.drop_all(connection)
+    metadata.create_all(connection)
+    connection.commit()
+    film_rows = [
+        {'id': generate(), 'title': f'Film {number}'} for number in range(films_count)
+    ]
+    actor_rows = [
+        {'id': generate(), 'full_name': f'Actor {number}'} for number in range(films_count)
+    ]
+    link_rows = [
+        {
+            'film_id': film['id'],
+            'id': generate(),
+            'actor_id': actor_rows[(position + cast) % films_count]['id'],
+        }
+        for position, film in enumerate(film_rows)
+        for cast in range(cast_size)
+    ]
+    report = {}
+    for table, rows in ((films, film_rows), (actors, actor_rows), (film_to_actor, link_rows)):
+        rate = insert(connection, table, rows)
+        report[table.name] = (rate, index_size(connection, table))
+    return report
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--films', type=int, default=100000)
+    parser.add_argument('--cast', type=int, default=10)
+    args = parser.parse_args()
+
+    with engine.connect() as connection:
+        connection.execute(text(f'CREATE SCHEMA IF NOT EXISTS {SCHEMA}'))
+        for label, generate in GENERATORS:
+            report = run(connection, generate, args.films, args.cast)
+            for table_name, (rate, size) in report.items():
+                print(f'{label} {table_name:14} {rate:10.0f} rows/s')
+                mebibytes = size / 2 ** 20
+                print(f'{label} {table_name:14} {mebibytes:10.2f} MiB primary key')
+        connection.execute(text(f'DROP SCHEMA {SCHEMA} CASCADE'))
+        connection.commit()
+
+
+if __name__ == '__main__':
+    main()
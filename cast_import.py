@@ -0,0 +1,248 @@
+"""A module for importing film casts page by page, the first page inline and the rest later."""
+
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from uuid import UUID
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+import config
+from changes import record_changes
+from imdb_api import get_film_cast
+from models import Actor, CastImport, FilmToActor
+from refresh import fetch_all
+
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+background = ThreadPoolExecutor(max_workers=config.CAST_IMPORT_WORKERS)
+
+
+def _read_page(session: Session, film_id: UUID) -> tuple[list, dict]:
+    """
+    Read the next page of a film cast and the ids of its actors already in the database.
+
+    The read transaction is ended before returning, so no connection or lock is held
+    while the missing actors are fetched from the API.
+
+    Args:
+        session (Session): The current database session.
+        film_id (UUID): The film id.
+
+    Returns:
+        tuple[list, dict]: The cast entries of the page, empty if none remain,
+            and the known actor ids by imdb_id.
+    """
+    progress = session.get(CastImport, film_id)
+    if progress is None or not progress.pending:
+        session.rollback()
+        return [], {}
+    cast_page = list(progress.pending[:config.CAST_PAGE_SIZE])
+    imdb_ids = list(dict.fromkeys(cast_entry['imdb_id'] for cast_entry in cast_page))
+    actor_ids = dict(
+        session.execute(select(Actor.imdb_id, Actor.id).where(Actor.imdb_id.in_(imdb_ids))).all(),
+    )
+    session.rollback()
+    return cast_page, actor_ids
+
+
+def _fetch_actors(imdb_ids: list) -> list:
+    """
+    Fetch new actors from the API.
+
+    Args:
+        imdb_ids (list): The IMDb IDs of the actors.
+
+    Returns:
+        list: The actors that could be fetched.
+    """
+    synced_at = datetime.now()
+    return [
+        Actor(**actor_data, last_synced_at=synced_at)
+        for actor_data in fetch_all(Actor, imdb_ids, config.CAST_FETCH_WORKERS)
+        if actor_data
+    ]
+
+
+def import_page(session: Session, film_id: UUID) -> bool:
+    """
+    Import the next page of a film cast.
+
+    The missing actors are fetched outside of any transaction; the progress row is then
+    locked only to write the page, so concurrent importers of a film take turns.
+    Cast entries whose actor could not be fetched are kept as failed for a resume.
+
+    Args:
+        session (Session): The current database session.
+        film_id (UUID): The film id.
+
+    Returns:
+        bool: True if pages remain to be imported.
+    """
+    cast_page, actor_ids = _read_page(session, film_id)
+    if not cast_page:
+        return False
+    new_actors = _fetch_actors(
+        list(dict.fromkeys(
+            cast_entry['imdb_id'] for cast_entry in cast_page
+            if cast_entry['imdb_id'] not in actor_ids
+        )),
+    )
+    progress = session.get(CastImport, film_id, with_for_update=True)
+    if progress is None or progress.pending[:len(cast_page)] != cast_page:
+        # The film was deleted or another importer wrote the page in the meantime.
+        session.rollback()
+        return progress is not None
+    session.add_all(new_actors)
+    session.flush()
+    actor_ids.update((actor.imdb_id, actor.id) for actor in new_actors)
+    links = [
+        FilmToActor(
+            film_id=film_id,
+            actor_id=actor_ids[cast_entry['imdb_id']],
+            character=cast_entry['character'],
+        )
+        for cast_entry in cast_page if cast_entry['imdb_id'] in actor_ids
+    ]
+    session.add_all(links)
+    _advance(progress, cast_page, actor_ids, len(links))
+    record_changes(session, 'insert', new_actors + links)
+    session.commit()
+    return bool(progress.pending)
+
+
+def _advance(progress: CastImport, cast_page: list, actor_ids: dict, imported: int) -> None:
+    """
+    Move the progress of a cast import past a written page.
+
+    Args:
+        progress (CastImport): The locked progress row.
+        cast_page (list): The cast entries of the page.
+        actor_ids (dict): The actor ids by imdb_id of the page.
+        imported (int): The number of links written.
+    """
+    progress.pending = progress.pending[len(cast_page):]
+    progress.failed = progress.failed + [
+        cast_entry for cast_entry in cast_page if cast_entry['imdb_id'] not in actor_ids
+    ]
+    progress.imported += imported
+    if progress.pending:
+        progress.status = RUNNING
+    else:
+        progress.status = FAILED if progress.failed else DONE
+
+
+def import_rest(session: Session, film_id: UUID, retries: int = 1) -> None:
+    """
+    Import all remaining pages of a film cast, marking the import failed on errors.
+
+    A page that races with another import of the same new actor is retried
+    once the other import has committed the actor.
+
+    Args:
+        session (Session): The current database session.
+        film_id (UUID): The film id.
+        retries (int): How many times to retry after a unique constraint violation.
+    """
+    has_pages = True
+    try:
+        while has_pages:
+            has_pages = import_page(session, film_id)
+    except IntegrityError:
+        session.rollback()
+        if retries:
+            import_rest(session, film_id, retries - 1)
+            return
+        _mark_failed(session, film_id)
+    except Exception:
+        session.rollback()
+        _mark_failed(session, film_id)
+
+
+def _mark_failed(session: Session, film_id: UUID) -> None:
+    """
+    Mark the cast import of a film as failed, keeping its pending entries for a resume.
+
+    Args:
+        session (Session): The current database session.
+        film_id (UUID): The film id.
+    """
+    progress = session.get(CastImport, film_id)
+    if progress is not None:
+        progress.status = FAILED
+        session.commit()
+
+
+def _import_in_background(engine, film_id: UUID) -> None:
+    """
+    Import the remaining pages of a film cast with a session of its own.
+
+    Args:
+        engine: The engine to connect with.
+        film_id (UUID): The film id.
+    """
+    with Session(engine) as session:
+        import_rest(session, film_id)
+
+
+def start(session: Session, film_id: UUID, imdb_id: str, depth: int | None) -> None:
+    """
+    Import the first page of a film cast and schedule the rest in the background.
+
+    Args:
+        session (Session): The current database session.
+        film_id (UUID): The film id.
+        imdb_id (str): The IMDb ID of the film.
+        depth (int | None): The maximum number of actors to import, None for the full cast.
+    """
+    cast = get_film_cast(imdb_id) or []
+    if depth:
+        cast = cast[:depth]
+    session.add(CastImport(film_id=film_id, total=len(cast), imported=0, pending=cast, failed=[]))
+    session.commit()
+    if import_page(session, film_id):
+        background.submit(_import_in_background, session.get_bind(), film_id)
+
+
+def get_progress(film_id: UUID, session: Session) -> dict | None:
+    """
+    Retrieve the progress of the cast import of a film.
+
+    Args:
+        film_id (UUID): The film id.
+        session (Session): The current database session.
+
+    Returns:
+        dict | None: The total, imported and status, or None if the cast was never imported.
+    """
+    progress = session.get(CastImport, film_id)
+    if progress is None:
+        return None
+    return {'total': progress.total, 'imported': progress.imported, 'status': progress.status}
+
+
+def resume(session: Session) -> int:
+    """
+    Finish the imports interrupted by a restart or an error, retrying the failed cast entries.
+
+    Args:
+        session (Session): The current database session.
+
+    Returns:
+        int: The number of resumed imports.
+    """
+    film_ids = session.scalars(
+        select(CastImport.film_id).where(CastImport.status != DONE),
+    ).all()
+    for film_id in film_ids:
+        progress = session.get(CastImport, film_id, with_for_update=True)
+        progress.pending = progress.failed + progress.pending
+        progress.failed = []
+        progress.status = RUNNING
+        session.commit()
+        import_rest(session, film_id)
+    return len(film_ids)
@@ -0,0 +1,150 @@
+"""A module for the change-data feed of catalogue writes."""
+
+
+import json
+import time
+from datetime import timedelta
+
+from sqlalchemy import delete, exists, func, or_, select
+from sqlalchemy.orm import Session, aliased
+
+import config
+from models import Base, Change
+from snapshot import bump_version
+
+
+def row_image(class_object: Base) -> dict:
+    """
+    Take the column values of an ORM object as JSON-compatible data.
+
+    Args:
+        class_object (Base): The ORM object.
+
+    Returns:
+        dict: The values of the table columns, with UUIDs and dates as strings.
+    """
+    row_data = {
+        column.key: getattr(class_object, column.key)
+        for column in class_object.__table__.columns
+    }
+    return json.loads(json.dumps(row_data, default=str))
+
+
+def record_changes(session: Session, operation: str, class_objects: list) -> None:
+    """
+    Append changes to the log inside the current write transaction.
+
+    The catalogue version is bumped first: its row lock serializes writers until commit,
+    so change ids are assigned in commit order and a consumer reading past its cursor
+    never skips a change that commits later.
+
+    Args:
+        session (Session): The session of the write transaction.
+        operation (str): 'insert', 'update' or 'delete'.
+        class_objects (list): The written ORM objects, as they are after the write.
+    """
+    bump_version(session)
+    session.add_all([
+        Change(
+            table_name=class_object.__tablename__,
+            row_id=class_object.id,
+            operation=operation,
+            row_data=row_image(class_object),
+        )
+        for class_object in class_objects
+    ])
+
+
+def latest_change_id(session: Session) -> int:
+    """
+    Read the id of the newest change.
+
+    Args:
+        session (Session): The current database session.
+
+    Returns:
+        int: The id, 0 for an empty log.
+    """
+    return session.scalar(select(func.coalesce(func.max(Change.id), 0)))
+
+
+def read_changes(session: Session, cursor: int, limit: int) -> list[dict]:
+    """
+    Read the changes after a cursor.
+
+    Args:
+        session (Session): The current database session.
+        cursor (int): The id of the last change the consumer has seen.
+        limit (int): The maximum number of changes to return.
+
+    Returns:
+        list[dict]: The changes in commit order.
+    """
+    log = session.scalars(
+        select(Change).where(Change.id > cursor).order_by(Change.id).limit(limit),
+    )
+    changes = [
+        {
+            'id': change.id,
+            'table': change.table_name,
+            'row_id': str(change.row_id),
+            'operation': change.operation,
+            'row': change.row_data,
+            'created_at': change.created_at.isoformat(),
+        }
+        for change in log
+    ]
+    session.rollback()
+    return changes
+
+
+def wait_for_changes(session: Session, cursor: int, limit: int, wait: float) -> list[dict]:
+    """
+    Long-poll the log until changes after the cursor appear or the wait expires.
+
+    Args:
+        session (Session): The current database session.
+        cursor (int): The id of the last change the consumer has seen.
+        limit (int): The maximum number of changes to return.
+        wait (float): The maximum time to wait in seconds.
+
+    Returns:
+        list[dict]: The changes in commit order, empty if none appeared in time.
+    """
+    deadline = time.monotonic() + wait
+    changes = read_changes(session, cursor, limit)
+    while not changes and time.monotonic() < deadline:
+        time.sleep(min(config.CHANGES_POLL_INTERVAL, max(deadline - time.monotonic(), 0)))
+        changes = read_changes(session, cursor, limit)
+    return changes
+
+
+def compact(session: Session, retention: timedelta) -> int:
+    """
+    Compact the log entries older than the retention period.
+
+    An old entry is removed when a newer entry exists for the same row, so the log keeps
+    the latest image of every row and a consumer starting from cursor 0 still rebuilds
+    the whole catalogue. Old delete entries are removed as well, like tombstones.
+
+    Args:
+        session (Session): The current database session.
+        retention (timedelta): How long all entries are kept.
+
+    Returns:
+        int: The number of removed entries.
+    """
+    newer = aliased(Change)
+    superseded = exists().where(
+        newer.table_name == Change.table_name,
+        newer.row_id == Change.row_id,
+        newer.id > Change.id,
+    )
+    removed = session.execute(
+        delete(Change).where(
+            Change.created_at < func.now() - retention,
+            or_(superseded, Change.operation == 'delete'),
+        ),
+    ).rowcount
+    session.commit()
+    return removed
@@ -4,11 +4,57 @@
 OK = 200
 CREATED = 201
 NO_CONTENT = 204
+NOT_MODIFIED = 304
 BAD_REQUEST = 400
 FORBIDDEN = 403
 SERVER_ERROR = 500
 NOT_FOUND = 404
 NOT_ALLOWED = 405
 ACCEPTED = 202
+BAD_GATEWAY = 502
 
 MYAPIFILMS_URL = 'https://www.myapifilms.com/imdb/idIMDB'
+MYAPIFILMS_REQUESTS_PER_SECOND = 5
+
+IMAGE_CACHE_DIR = 'image_cache'
+IMAGE_CACHE_MAX_BYTES = 268435456
+IMAGE_MAX_SOURCE_BYTES = 16777216
+IMAGE_MAX_AGE = 31536000
+THUMBNAIL_WIDTH = 300
+DETAIL_IMAGE_WIDTH = 600
+
+SNAPSHOT_PATH = 'catalogue.snapshot'
+SNAPSHOT_CHECK_INTERVAL = 1.0
+
+CHANGES_PAGE_SIZE = 500
+CHANGES_POLL_INTERVAL = 0.5
+CHANGES_MAX_WAIT = 30
+CHANGES_RETENTION_DAYS = 7
+
+REFRESH_BATCH_SIZE = 100
+REFRESH_WORKERS = 4
+
+DEFAULT_CAST_DEPTH = 5
+CAST_PAGE_SIZE = 5
+CAST_FETCH_WORKERS = 4
+CAST_IMPORT_WORKERS = 2
+CAST_PROGRESS_REFRESH = 5
+
+API_COMPRESS_MIN_BYTES = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+REPLICA_CHECK_INTERVAL = 5.0
+REPLICA_CONNECT_TIMEOUT = 2
+READ_AFTER_WRITE_WINDOW = 10
+
+SIMILAR_FILMS_K = 10
+SIMILAR_YEAR_WEIGHT = 0.2
+SIMILAR_YEAR_SCALE = 20
+SIMILAR_COUNTRY_WEIGHT = 0.1
+
+TEMPLATE_CACHE_DIR = 'template_cache'
+FRAGMENT_CACHE_SIZE = 20000
+
+GROUP_COMMIT_WINDOW_MS = 5
+GROUP_COMMIT_MAX_BATCH = 100
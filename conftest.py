@@ -0,0 +1,23 @@
+"""Shared pytest fixtures."""
+
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from models import Base
+
+
+@pytest.fixture(name='memory_session')
+def empty_memory_session():
+    """
+    Create the tables in an in-memory database.
+
+    Yields:
+        Session: The database session.
+    """
+    engine = create_engine('sqlite://', poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
@@ -2,43 +2,97 @@
 
 
 import os
+from datetime import datetime
 from typing import Callable
 from uuid import UUID
 
 from dotenv import load_dotenv
-from sqlalchemy import create_engine, select
+from sqlalchemy import create_engine, select, update
 from sqlalchemy.exc import DataError, IntegrityError, ProgrammingError
-from sqlalchemy.orm import Session, exc
+from sqlalchemy.orm import Session
 
-from imdb_api import get_film_actors_data, get_film_data
+import cast_import
+import config
+from changes import record_changes
+from imdb_api import get_film_data
 from models import Actor, Film, FilmToActor
+from routing import ReplicaPool
 
 
-def get_db_url() -> str:
+def get_db_url(replica_host: str | None = None) -> str:
     """
     Load environment variables and construct a PostgreSQL connection URL.
 
+    Args:
+        replica_host (str | None): host:port of a read replica, None for the primary.
+
     Returns:
         str: The constructed PostgreSQL connection URL.
     """
     load_dotenv()
     pg_vars = ['PG_HOST', 'PG_PORT', 'PG_USER', 'PG_PASSWORD', 'PG_DBNAME']
     credentials = {pg_var: os.environ.get(pg_var) for pg_var in pg_vars}
+    if replica_host:
+        host, port = replica_host.strip().rsplit(':', 1)
+        credentials.update(PG_HOST=host, PG_PORT=port)
     return 'postgresql+psycopg2://{PG_USER}:{PG_PASSWORD}@{PG_HOST}:{PG_PORT}/{PG_DBNAME}'.format(
         **credentials,
     )
 
 
+def get_replica_urls() -> list[str]:
+    """
+    Construct the connection URLs of the read replicas listed in PG_REPLICA_HOSTS.
+
+    Entries without a host or a port, such as `host:` from an unset port variable, are skipped.
+
+    Returns:
+        list[str]: The replica URLs, empty when no replicas are configured.
+    """
+    load_dotenv()
+    replica_urls = []
+    for replica_host in os.environ.get('PG_REPLICA_HOSTS', '').split(','):
+        host, _, port = replica_host.strip().rpartition(':')
+        if host and port:
+            replica_urls.append(get_db_url(replica_host))
+    return replica_urls
+
+
 engine = create_engine(get_db_url(), echo=False)
+replicas = ReplicaPool(
+    engine,
+    [
+        create_engine(
+            url, echo=False, connect_args={'connect_timeout': config.REPLICA_CONNECT_TIMEOUT},
+        )
+        for url in get_replica_urls()
+    ],
+    config.REPLICA_CHECK_INTERVAL,
+)
+
+
+def read_session() -> Session:
+    """
+    Open a session for catalogue reads on a healthy read replica.
+
+    Writes and reads that must see the caller's own writes use Session(engine) instead.
+
+    Returns:
+        Session: A session bound to the next replica, or to the primary without replicas.
+    """
+    return Session(replicas.reader())
 
 
-def add_film_api(imdb_id: str, session: Session) -> Film | None:
+def add_film_api(
+    imdb_id: str, session: Session, cast_depth: int | None = config.DEFAULT_CAST_DEPTH,
+) -> Film | None:
     """
     Add a film to the database if it doesn't exist already.
 
     Args:
         imdb_id (str): The IMDb ID of the film.
         session (Session): The current database session.
+        cast_depth (int | None): The maximum number of actors to import, None for the full cast.
 
     Returns:
         Film | None: The added film instance or None if the film exists or cannot be added.
@@ -48,40 +102,55 @@ def add_film_api(imdb_id: str, session: Session) -> Film | None:
         return film.id
     film_data = get_film_data(imdb_id)
     if film_data:
-        film = Film(**film_data)
+        film = Film(**film_data, last_synced_at=datetime.now())
         session.add(film)
+        record_changes(session, 'insert', [film])
         session.commit()
-        add_actors_api(film.id, imdb_id, session)
+        add_actors_api(film.id, imdb_id, session, cast_depth)
         return film.id
     return None
 
 
-def add_actors_api(film_id: Film, imdb_id: str, session: Session):
+def add_actors_api(film_id: UUID, imdb_id: str, session: Session, cast_depth: int | None):
     """
     Add actors associated with a film to the database.
 
+    The first page of the cast is imported before returning, \
+        the remaining pages are imported in the background.
+
     Args:
-        film_id (Film): The film instance to associate actors with.
+        film_id (UUID): The id of the film to associate actors with.
         imdb_id (str): The IMDb ID of the film.
         session (Session): The current database session.
+        cast_depth (int | None): The maximum number of actors to import, None for the full cast.
     """
-    actors_data = get_film_actors_data(imdb_id)
-    actors = [
-        [Actor(**actor_data['actor']), actor_data['character']] for actor_data in actors_data
-    ]
-    session.add_all([actor[0] for actor in actors])
-    session.flush()
-    film_to_actors = [
-        FilmToActor(film_id=film_id, actor_id=actor[0].id, character=actor[1]) for actor in actors
-    ]
-    session.add_all(film_to_actors)
-    session.commit()
+    cast_import.start(session, film_id, imdb_id, cast_depth)
+
+
+def cascaded_links(class_object_model, class_object_id: UUID, session: Session) -> list:
+    """
+    Select the film_to_actor rows that deleting a film or an actor removes by cascade.
+
+    Args:
+        class_object_model: The SQLAlchemy ORM class of the deleted class object.
+        class_object_id (UUID): The id of the deleted class object.
+        session (Session): The current database session.
+
+    Returns:
+        list: The links of the film or the actor, empty for other class objects.
+    """
+    link_column = {Film: FilmToActor.film_id, Actor: FilmToActor.actor_id}.get(class_object_model)
+    if link_column is None:
+        return []
+    return session.scalars(select(FilmToActor).where(link_column == class_object_id)).all()
 
 
 def create_delete(class_object_model) -> Callable:
     """
     Create a function to delete an class object from the database.
 
+    The film_to_actor rows removed by cascade are logged as deletes in the same transaction.
+
     Args:
         class_object_model: The SQLAlchemy ORM class representing the class object to delete.
 
@@ -95,6 +164,11 @@ def create_delete(class_object_model) -> Callable:
             )
             if not class_object:
                 return None
+            record_changes(
+                session,
+                'delete',
+                [*cascaded_links(class_object_model, class_object_id, session), class_object],
+            )
             session.delete(class_object)
             session.commit()
             return 1
@@ -122,6 +196,7 @@ def create_add(class_object_model) -> Callable:
         try:
             class_object = class_object_model(**class_object_data)
             session.add(class_object)
+            record_changes(session, 'insert', [class_object])
             session.commit()
             return class_object.id
         except IntegrityError:
@@ -142,6 +217,8 @@ def create_update(class_object_model) -> Callable:
     """
     Create a function to update an existing class object in the database.
 
+    Keys that are not columns of the class object are ignored.
+
     Args:
         class_object_model: The SQLAlchemy ORM class representing the class object to update.
 
@@ -149,19 +226,28 @@ def create_update(class_object_model) -> Callable:
         Callable: A function that updates an class object in the database.
     """
     def update_class_object(new_class_object_data: dict, session: Session):
+        columns = class_object_model.__table__.columns
         try:
-            session.bulk_update_mappings(
-                class_object_model, [
-                    {'id': new_class_object_data['id'], **new_class_object_data},
-                ],
+            updated = session.execute(
+                update(class_object_model).where(
+                    class_object_model.id == new_class_object_data['id'],
+                ).values({
+                    field: field_value
+                    for field, field_value in new_class_object_data.items()
+                    if field in columns
+                }),
             )
+            if not updated.rowcount:
+                return None
+            class_object = session.scalar(
+                select(class_object_model).where(
+                    class_object_model.id == new_class_object_data['id'],
+                ).execution_options(populate_existing=True),
+            )
+            record_changes(session, 'update', [class_object])
             session.commit()
             return new_class_object_data['id']
-        except DataError:
-            return None
-        except exc.StaleDataError:
-            return None
-        except IntegrityError:
+        except (DataError, IntegrityError):
             return None
     return update_class_object
 
@@ -220,12 +306,16 @@ def create_get_all(class_object_model) -> Callable:
 
 
 get_all_films = create_get_all(Film)
+get_all_actors = create_get_all(Actor)
 
 
 def get_film_actors(film_id, session: Session) -> list[dict]:
     """
     Retrieve a list of actors associated with a specific film along with their characters.
 
+    film_to_actor is filtered by film_id, its partition key, before the join to actors,
+    so Postgres prunes the lookup to a single hash partition.
+
     Args:
         film_id: The ID of the film to retrieve actors for.
         session (Session): The SQLAlchemy session used to execute the query.
@@ -237,10 +327,9 @@ def get_film_actors(film_id, session: Session) -> list[dict]:
                     or if no actors are associated with the film.
     """
     try:
-        query = select(Actor, FilmToActor.character.label('character')).select_from(
-            FilmToActor.__table__.join(
-                Actor, FilmToActor.actor_id == Actor.id,
-            )).where(FilmToActor.film_id == film_id)
+        query = select(Actor, FilmToActor.character.label('character')).join_from(
+            FilmToActor, Actor, FilmToActor.actor_id == Actor.id,
+        ).where(FilmToActor.film_id == UUID(str(film_id)))
         actors_with_characters_data = session.execute(query)
         actors_with_characters = []
         for row in actors_with_characters_data:
@@ -0,0 +1,63 @@
+"""A module for caching the rendered HTML of film and actor cards."""
+
+
+from collections import OrderedDict
+from threading import Lock
+
+from jinja2 import Environment
+from markupsafe import Markup
+
+FILM_CARD_FIELDS = ('id', 'imdb_id', 'title', 'year', 'country', 'imdb_rating', 'poster')
+ACTOR_CARD_FIELDS = ('id', 'photo', 'character')
+
+
+class FragmentCache:
+    """LRU cache of rendered card templates, keyed by the entity values they show."""
+
+    def __init__(self, environment: Environment, max_entries: int) -> None:
+        """
+        Initialize the cache.
+
+        Args:
+            environment (Environment): The Jinja environment of the card templates.
+            max_entries (int): The maximum number of cached cards, 0 disables caching.
+        """
+        self.environment = environment
+        self.max_entries = max_entries
+        self._fragments = OrderedDict()
+        self._lock = Lock()
+
+    def render(self, template_name: str, fields: tuple, entity: dict) -> Markup:
+        """
+        Render a card, reusing the cached HTML while the entity is unchanged.
+
+        The key holds every value the card shows, so an update of the entity
+        misses the old entry, which then ages out of the LRU order.
+
+        Args:
+            template_name (str): The card template, which receives the entity as `entity`.
+            fields (tuple): The entity fields the card shows.
+            entity (dict): The film or actor.
+
+        Returns:
+            Markup: The rendered card.
+        """
+        key = (template_name, *(entity.get(field) for field in fields))
+        with self._lock:
+            fragment = self._fragments.get(key)
+            if fragment is not None:
+                self._fragments.move_to_end(key)
+                return fragment
+        template = self.environment.get_template(template_name)
+        fragment = Markup(template.render(entity=entity))
+        if self.max_entries:
+            with self._lock:
+                self._fragments[key] = fragment
+                if len(self._fragments) > self.max_entries:
+                    self._fragments.popitem(last=False)
+        return fragment
+
+    def clear(self) -> None:
+        """Drop all cached cards."""
+        with self._lock:
+            self._fragments.clear()
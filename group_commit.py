@@ -0,0 +1,170 @@
+"""A module for merging concurrent single-record creates into group commits."""
+
+
+from threading import Event, Lock
+from uuid import UUID
+
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DataError, IntegrityError, ProgrammingError
+from sqlalchemy.orm import Session
+
+from changes import record_changes
+from models import Base
+
+WRITE_ERRORS = (IntegrityError, ProgrammingError, DataError)
+
+
+class GroupCommitter:
+    """Collect the creates of concurrent requests for a short window and commit them together."""
+
+    def __init__(self, engine: Engine, window: float, max_batch: int) -> None:
+        """
+        Initialize the committer.
+
+        Args:
+            engine (Engine): The engine of the primary.
+            window (float): How long the first write of a batch waits for others, in seconds.
+            max_batch (int): The number of writes that commits a batch before the window ends.
+        """
+        self.engine = engine
+        self.window = window
+        self.max_batch = max_batch
+        self._pending = []
+        self._lock = Lock()
+        self._batch_full = Event()
+
+    def submit(self, class_object_model: type[Base], class_object_data: dict) -> UUID | None:
+        """
+        Create a class object as part of the next group commit.
+
+        The first write of a batch leads it: it waits for the window to end or the batch
+        to fill up, then commits every write of the batch, while the others wait for it.
+
+        Args:
+            class_object_model (type[Base]): The ORM class of the class object.
+            class_object_data (dict): The column values.
+
+        Returns:
+            UUID | None: The id of the created class object, None if the database rejected it.
+
+        Raises:
+            error: Any other error of this write or of the batch commit.
+        """
+        write = {
+            'model': class_object_model,
+            'data': class_object_data,
+            'id': None,
+            'error': None,
+            'done': Event(),
+        }
+        with self._lock:
+            self._pending.append(write)
+            leader = len(self._pending) == 1
+            if len(self._pending) >= self.max_batch:
+                self._batch_full.set()
+        if leader:
+            self._batch_full.wait(self.window)
+            with self._lock:
+                batch = self._pending
+                self._pending = []
+                self._batch_full.clear()
+            self.commit(batch)
+        write['done'].wait()
+        error = write['error']
+        if error is not None:
+            raise error
+        return write['id']
+
+    def commit(self, batch: list[dict]) -> None:
+        """
+        Commit a batch of writes and wake up their writers.
+
+        Args:
+            batch (list[dict]): The pending writes.
+        """
+        try:
+            self.insert(batch)
+        except Exception as error:  # noqa: B902
+            for failed_write in batch:
+                failed_write['error'] = error
+        finally:
+            for finished_write in batch:
+                finished_write['done'].set()
+
+    def insert(self, batch: list[dict]) -> None:
+        """
+        Insert a batch of writes in one transaction and record the ids of the writes.
+
+        If the database rejects the batch, the writes are retried one savepoint each,
+        so only the rejected ones fail.
+
+        Args:
+            batch (list[dict]): The pending writes.
+        """
+        written = build(batch)
+        with Session(self.engine, expire_on_commit=False) as session:
+            try:
+                insert_all(session, written)
+            except WRITE_ERRORS:
+                session.rollback()
+                written = insert_each(session, build(batch))
+        for write, class_object in written:
+            write['id'] = class_object.id
+
+
+def build(batch: list[dict]) -> list[tuple]:
+    """
+    Build the class objects of a batch, failing the writes with invalid fields.
+
+    Args:
+        batch (list[dict]): The pending writes.
+
+    Returns:
+        list[tuple]: The (write, class object) pairs of the valid writes.
+    """
+    built = []
+    for write in batch:
+        try:
+            built.append((write, write['model'](**write['data'])))
+        except TypeError as error:
+            write['error'] = error
+    return built
+
+
+def insert_all(session: Session, written: list[tuple]) -> None:
+    """
+    Insert class objects with a single flush and commit them with their changes.
+
+    Args:
+        session (Session): The session of the batch transaction.
+        written (list[tuple]): The (write, class object) pairs.
+    """
+    class_objects = [class_object for _, class_object in written]
+    session.add_all(class_objects)
+    record_changes(session, 'insert', class_objects)
+    session.commit()
+
+
+def insert_each(session: Session, written: list[tuple]) -> list[tuple]:
+    """
+    Insert class objects one savepoint each and commit the ones the database accepted.
+
+    Args:
+        session (Session): The session of the batch transaction.
+        written (list[tuple]): The (write, class object) pairs.
+
+    Returns:
+        list[tuple]: The committed (write, class object) pairs.
+    """
+    accepted = []
+    for write, class_object in written:
+        try:
+            with session.begin_nested():
+                session.add(class_object)
+        except WRITE_ERRORS:
+            continue
+        accepted.append((write, class_object))
+    if accepted:
+        record_changes(session, 'insert', [accepted_object for _, accepted_object in accepted])
+    session.commit()
+    return accepted
@@ -0,0 +1,307 @@
+"""A module for proxying remote posters and photos through an on-disk thumbnail cache."""
+
+
+import hashlib
+import hmac
+import io
+import itertools
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import requests
+from PIL import Image, UnidentifiedImageError
+
+import config
+
+TIMEOUT = 30
+CHUNK_SIZE = 65536
+THUMBNAIL_FORMAT = 'JPEG'
+THUMBNAIL_QUALITY = 85
+BLOBS = 'blobs'
+REFS = 'refs'
+EVICT_EVERY = 100
+LOCK_STRIPES = 64
+
+_locks = tuple(threading.Lock() for _ in range(LOCK_STRIPES))
+_stores = itertools.count(1)
+
+
+class ImageFetchError(Exception):
+    """Exception raised when a remote image cannot be fetched or decoded."""
+
+    def __init__(self, url: str) -> None:
+        """
+        Initialize the ImageFetchError exception with a custom error message.
+
+        Args:
+            url (str): The URL of the image that could not be fetched.
+        """
+        super().__init__(f'Unable to fetch image: {url}')
+
+
+def sign_url(url: str, width: int, secret: str) -> str:
+    """
+    Sign an image URL so that the proxy only serves images rendered by the app.
+
+    Args:
+        url (str): The remote image URL.
+        width (int): The requested thumbnail width.
+        secret (str): The application secret key.
+
+    Returns:
+        str: The hex signature for the pair of URL and width.
+    """
+    message = f'{url}\n{width}'.encode()
+    return hmac.new(secret.encode(), message, hashlib.sha256).hexdigest()
+
+
+def _cache_path(cache_dir: Path, kind: str, name: str) -> Path:
+    """
+    Build the path of a cache entry, sharded by the first two characters of its name.
+
+    Args:
+        cache_dir (Path): The root directory of the cache.
+        kind (str): Either BLOBS for image contents or REFS for key to blob references.
+        name (str): The hex name of the entry.
+
+    Returns:
+        Path: The path of the cache entry.
+    """
+    return cache_dir / kind / name[:2] / name
+
+
+def _write_atomic(path: Path, file_bytes: bytes) -> None:
+    """
+    Write a file so that concurrent readers never see a partially written entry.
+
+    Args:
+        path (Path): The destination path.
+        file_bytes (bytes): The data to write.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+    with os.fdopen(fd, 'wb') as tmp_file:
+        tmp_file.write(file_bytes)
+    os.replace(tmp_name, path)
+
+
+def _lookup(cache_dir: Path, key: str) -> str | None:
+    """
+    Find the blob referenced by a cache key and mark it as recently used.
+
+    Args:
+        cache_dir (Path): The root directory of the cache.
+        key (str): The cache key.
+
+    Returns:
+        str | None: The content digest of the blob or None if it is not cached.
+    """
+    try:
+        digest = _cache_path(cache_dir, REFS, key).read_text()
+    except FileNotFoundError:
+        return None
+    try:
+        os.utime(_cache_path(cache_dir, BLOBS, digest))
+    except FileNotFoundError:
+        return None
+    return digest
+
+
+def _store(cache_dir: Path, key: str, blob: bytes) -> str:
+    """
+    Store a blob under its own digest and point the cache key at it.
+
+    Args:
+        cache_dir (Path): The root directory of the cache.
+        key (str): The cache key.
+        blob (bytes): The data to store.
+
+    Returns:
+        str: The content digest of the stored blob.
+    """
+    digest = hashlib.sha256(blob).hexdigest()
+    blob_path = _cache_path(cache_dir, BLOBS, digest)
+    if not blob_path.exists():
+        _write_atomic(blob_path, blob)
+    _write_atomic(_cache_path(cache_dir, REFS, key), digest.encode())
+    return digest
+
+
+def fetch_image(url: str) -> bytes:
+    """
+    Download a remote image, refusing sources larger than IMAGE_MAX_SOURCE_BYTES.
+
+    Args:
+        url (str): The remote image URL.
+
+    Returns:
+        bytes: The raw image data.
+
+    Raises:
+        ImageFetchError: If the image cannot be downloaded.
+    """
+    image_bytes = bytearray()
+    try:
+        with requests.get(url, timeout=TIMEOUT, stream=True) as response:
+            if response.status_code != config.OK:
+                raise ImageFetchError(url)
+            for chunk in response.iter_content(CHUNK_SIZE):
+                image_bytes.extend(chunk)
+                if len(image_bytes) > config.IMAGE_MAX_SOURCE_BYTES:
+                    raise ImageFetchError(url)
+    except requests.RequestException as error:
+        raise ImageFetchError(url) from error
+    return bytes(image_bytes)
+
+
+def make_thumbnail(image_bytes: bytes, width: int) -> bytes:
+    """
+    Resize an image to the given width, keeping its aspect ratio and never upscaling.
+
+    Args:
+        image_bytes (bytes): The raw source image data.
+        width (int): The maximum width of the thumbnail.
+
+    Returns:
+        bytes: The thumbnail encoded as JPEG.
+
+    Raises:
+        ValueError: If the data is not a supported image.
+    """
+    try:
+        image = Image.open(io.BytesIO(image_bytes)).convert('RGB')
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as error:
+        raise ValueError('Unsupported image') from error
+    image.thumbnail((width, image.height))
+    output = io.BytesIO()
+    image.save(output, THUMBNAIL_FORMAT, quality=THUMBNAIL_QUALITY, optimize=True)
+    return output.getvalue()
+
+
+def _cached(cache_dir: Path, key: str) -> tuple[str, bytes] | None:
+    """
+    Read the blob referenced by a cache key.
+
+    A blob evicted by another thread or process after the lookup is a cache miss.
+
+    Args:
+        cache_dir (Path): The root directory of the cache.
+        key (str): The cache key.
+
+    Returns:
+        tuple[str, bytes] | None: The content digest and the data, or None if it is not cached.
+    """
+    digest = _lookup(cache_dir, key)
+    if digest is None:
+        return None
+    try:
+        return digest, _cache_path(cache_dir, BLOBS, digest).read_bytes()
+    except FileNotFoundError:
+        return None
+
+
+def _render(url: str, width: int, cache_dir: Path, keys: tuple[str, str]) -> tuple[str, bytes]:
+    """
+    Make a thumbnail from the cached or freshly fetched source image and cache it.
+
+    Args:
+        url (str): The remote image URL.
+        width (int): The thumbnail width.
+        cache_dir (Path): The root directory of the cache.
+        keys (tuple[str, str]): The cache keys of the source image and of the thumbnail.
+
+    Returns:
+        tuple[str, bytes]: The content digest of the thumbnail and its data.
+
+    Raises:
+        ImageFetchError: If the source image cannot be fetched or decoded.
+    """
+    source_key, thumbnail_key = keys
+    source = _cached(cache_dir, source_key)
+    if source is None:
+        source_bytes = fetch_image(url)
+        _store(cache_dir, source_key, source_bytes)
+    else:
+        source_bytes = source[1]
+    try:
+        thumbnail = make_thumbnail(source_bytes, width)
+    except ValueError as error:
+        raise ImageFetchError(url) from error
+    digest = _store(cache_dir, thumbnail_key, thumbnail)
+    if next(_stores) % EVICT_EVERY == 0:
+        evict(cache_dir, config.IMAGE_CACHE_MAX_BYTES)
+    return digest, thumbnail
+
+
+def get_thumbnail(url: str, width: int, cache_dir: Path) -> tuple[str, bytes]:
+    """
+    Return a cached thumbnail, fetching the source image at most once for all widths.
+
+    The data is returned rather than the path, so a later eviction cannot remove
+    the thumbnail while it is being sent.
+
+    Args:
+        url (str): The remote image URL.
+        width (int): The thumbnail width.
+        cache_dir (Path): The root directory of the cache.
+
+    Returns:
+        tuple[str, bytes]: The content digest of the thumbnail and its data.
+    """
+    source_key = hashlib.sha256(url.encode()).hexdigest()
+    thumbnail_key = hashlib.sha256(f'{url}\n{width}'.encode()).hexdigest()
+    with _locks[hash(source_key) % LOCK_STRIPES]:
+        thumbnail = _cached(cache_dir, thumbnail_key)
+        if thumbnail is None:
+            thumbnail = _render(url, width, cache_dir, (source_key, thumbnail_key))
+    return thumbnail
+
+
+def evict(cache_dir: Path, max_bytes: int) -> int:
+    """
+    Remove the least recently used blobs until the cache fits into max_bytes.
+
+    References to missing blobs are removed too, so the cache stays bounded.
+
+    Args:
+        cache_dir (Path): The root directory of the cache.
+        max_bytes (int): The maximum total size of the cached blobs.
+
+    Returns:
+        int: The number of removed blobs.
+    """
+    blobs = []
+    for blob_path in (cache_dir / BLOBS).glob('*/*'):
+        try:
+            blob_stat = blob_path.stat()
+        except FileNotFoundError:
+            continue
+        blobs.append((blob_stat.st_mtime, blob_stat.st_size, blob_path))
+    total_size = sum(blob[1] for blob in blobs)
+    removed = 0
+    for _, blob_size, oldest_path in sorted(blobs):
+        if total_size <= max_bytes:
+            break
+        oldest_path.unlink(missing_ok=True)
+        total_size -= blob_size
+        removed += 1
+    _prune_refs(cache_dir)
+    return removed
+
+
+def _prune_refs(cache_dir: Path) -> None:
+    """
+    Remove the references whose blobs have been evicted.
+
+    Args:
+        cache_dir (Path): The root directory of the cache.
+    """
+    for ref_path in (cache_dir / REFS).glob('*/*'):
+        try:
+            digest = ref_path.read_text()
+        except FileNotFoundError:
+            continue
+        if not _cache_path(cache_dir, BLOBS, digest).exists():
+            ref_path.unlink(missing_ok=True)
@@ -1,6 +1,8 @@
 """A module for working with an external imdb api (MYAPIFILMS)."""
 
 
+import threading
+import time
 from datetime import datetime
 from os import getenv
 
@@ -34,6 +36,43 @@ class ForeignApiError(Exception):
         super().__init__(f'External API request error, error code: {status_code}')
 
 
+class RateLimiter:
+    """
+    Token bucket shared by all threads of the process to stay within the API quota.
+
+    The bucket is per process: every gunicorn worker and the refresh service have
+    their own, so their MYAPIFILMS_RATE values must add up to the account quota.
+    """
+
+    def __init__(self, rate: float) -> None:
+        """
+        Initialize the limiter with a full bucket of one token.
+
+        Args:
+            rate (float): The allowed number of requests per second, 0 disables the limit.
+        """
+        self._rate = rate
+        self._tokens = 1.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Reserve one request, sleeping until the reservation is due."""
+        if self._rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(1.0, self._tokens + (now - self._updated) * self._rate)
+            self._updated = now
+            self._tokens -= 1
+            delay = -self._tokens / self._rate
+        if delay > 0:
+            time.sleep(delay)
+
+
+quota = RateLimiter(float(getenv('MYAPIFILMS_RATE', config.MYAPIFILMS_REQUESTS_PER_SECOND)))
+
+
 def get_data(options: dict) -> dict:
     """
     Fetch data from an external API based on provided options.
@@ -60,6 +99,7 @@ def get_data(options: dict) -> dict:
 
     options[entities[entity]] = options.pop(entity)
     options.update(default_options)
+    quota.acquire()
     response = requests.get(config.MYAPIFILMS_URL, params=options, timeout=TIMEOUT)
     if response.status_code != config.OK:
         raise ForeignApiError(response.status_code)
@@ -157,27 +197,21 @@ def get_actor_data(imdb_id: str):
     return actor_data
 
 
-def get_film_actors_data(imdb_id: str):
+def get_film_cast(imdb_id: str):
     """
-    Retrieve a list of actors associated with a film from an external API.
+    Retrieve the full cast list of a film from an external API in a single request.
 
     Args:
-        imdb_id (str): The IMDb ID of the film whose actors' data is to be fetched.
+        imdb_id (str): The IMDb ID of the film whose cast is to be fetched.
 
     Returns:
-        list: A list of dictionaries, \
-            each containing formatted data for an actor associated with the film.
+        list: A list of dictionaries with the imdb_id and the character of each actor, \
+            or None if the film is not found.
     """
     all_data = get_data({'film': imdb_id, 'actors': 1})
     if 'error' in all_data:
         return None
     film_actors = all_data['data']['movies'][0]['actors']
-    film_actors = film_actors if len(film_actors) <= 5 else film_actors[:5]
-    actors_data_list = []
-    for actor in film_actors:
-        actor_imdb_id = actor['idIMDB']
-        character = actor['character']
-        actor_data = get_actor_data(actor_imdb_id)
-        actor_data_dict = {'actor': actor_data, 'character': character}
-        actors_data_list.append(actor_data_dict)
-    return actors_data_list
+    return [
+        {'imdb_id': actor['idIMDB'], 'character': actor['character']} for actor in film_actors
+    ]
@@ -0,0 +1,130 @@
+"""A module for serializing, compressing and revalidating the JSON read API responses."""
+
+
+import gzip
+import hashlib
+import json
+
+from flask import Request, Response
+
+import config
+import snapshot
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+ENCODINGS = ('br', 'gzip') if brotli else ('gzip',)
+FILM_FIELDS = ('id',) + tuple(field for field, _ in snapshot.FILM_FIELDS)
+ACTOR_FIELDS = ('id',) + tuple(field for field, _ in snapshot.ACTOR_FIELDS)
+FILM_DETAIL_FIELDS = FILM_FIELDS + ('cast',)
+CAST_FIELDS = ACTOR_FIELDS + ('character',)
+
+
+class UnknownFieldsError(ValueError):
+    """Exception raised when ?fields= names fields the resource does not have."""
+
+
+def dumps(payload) -> bytes:
+    """
+    Serialize data to JSON with orjson, or with the json module when orjson is not installed.
+
+    Args:
+        payload: The data, where UUIDs and dates are written as strings.
+
+    Returns:
+        bytes: The UTF-8 encoded JSON.
+    """
+    if orjson:
+        return orjson.dumps(payload, default=str)
+    return json.dumps(payload, ensure_ascii=False, default=str).encode()
+
+
+def requested_fields(fields_arg: str | None, allowed: tuple) -> tuple:
+    """
+    Parse the ?fields= argument.
+
+    Args:
+        fields_arg (str | None): Comma-separated field names, None for all fields.
+        allowed (tuple): The fields of the resource.
+
+    Returns:
+        tuple: The selected fields in the order of the resource.
+
+    Raises:
+        UnknownFieldsError: If a requested field does not exist.
+    """
+    if not fields_arg:
+        return allowed
+    fields = {field.strip() for field in fields_arg.split(',') if field.strip()}
+    unknown = fields.difference(allowed)
+    if unknown:
+        unknown_list = ', '.join(sorted(unknown))
+        raise UnknownFieldsError(f'Unknown fields: {unknown_list}')
+    return tuple(field for field in allowed if field in fields)
+
+
+def pick(record: dict, fields: tuple) -> dict:
+    """
+    Keep only the selected fields of a record.
+
+    Args:
+        record (dict): The record returned by db or a snapshot.
+        fields (tuple): The selected fields.
+
+    Returns:
+        dict: The record restricted to the fields.
+    """
+    return {field: record.get(field) for field in fields}
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compress a body with a content coding.
+
+    Args:
+        body (bytes): The body.
+        encoding (str): 'br' or 'gzip'.
+
+    Returns:
+        bytes: The compressed body.
+    """
+    if encoding == 'br':
+        return brotli.compress(body, quality=config.BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=config.GZIP_LEVEL)
+
+
+def json_response(payload, request: Request) -> Response:
+    """
+    Build a revalidatable JSON response compressed for the client.
+
+    The ETag is taken over the uncompressed JSON, so a matching If-None-Match gets
+    a 304 before anything is compressed. It is weak because it covers every encoding.
+
+    Args:
+        payload: The data to serialize.
+        request (Request): The current request.
+
+    Returns:
+        Response: The JSON response, or an empty 304 when the client copy is current.
+    """
+    body = dumps(payload)
+    response = Response(body, mimetype='application/json')
+    response.set_etag(hashlib.sha256(body).hexdigest(), weak=True)
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    response.vary.add('Accept-Encoding')
+    response.make_conditional(request)
+    if response.status_code != config.OK or len(body) < config.API_COMPRESS_MIN_BYTES:
+        return response
+    encoding = request.accept_encodings.best_match(ENCODINGS)
+    if encoding:
+        response.set_data(compress(body, encoding))
+        response.content_encoding = encoding
+    return response
@@ -0,0 +1,74 @@
+"""partition film_to_actor
+
+Hash-partitions film_to_actor by film_id. The primary key becomes (film_id, id),
+because a unique index of a partitioned table has to include the partition key,
+and doubles as the per-film lookup index that the single-column id key never was.
+Links without a film cannot be placed in a partition and are dropped.
+
+The copy runs in one INSERT ... SELECT inside the migration transaction; on a table
+with hundreds of millions of rows run it in a maintenance window.
+
+Revision ID: e4b1c7d2a9f3
+Revises: b77a96180997
+Create Date: 2026-10-19 10:12:40.518233
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b1c7d2a9f3'
+down_revision: Union[str, None] = 'b77a96180997'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+PARTITIONS = 16
+COLUMNS = 'id, film_id, actor_id, character'
+
+
+def upgrade() -> None:
+    op.rename_table('film_to_actor', 'film_to_actor_unpartitioned')
+    op.execute('ALTER INDEX film_to_actor_pkey RENAME TO film_to_actor_unpartitioned_pkey')
+    op.create_table('film_to_actor',
+    sa.Column('film_id', sa.Uuid(), nullable=False),
+    sa.Column('actor_id', sa.Uuid(), nullable=True),
+    sa.Column('character', sa.String(), nullable=True),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['actor_id'], ['actors.id'], ondelete='cascade'),
+    sa.ForeignKeyConstraint(['film_id'], ['films.id'], ondelete='cascade'),
+    sa.PrimaryKeyConstraint('film_id', 'id'),
+    postgresql_partition_by='HASH (film_id)',
+    )
+    for remainder in range(PARTITIONS):
+        op.execute(
+            f'CREATE TABLE film_to_actor_p{remainder} PARTITION OF film_to_actor '
+            f'FOR VALUES WITH (MODULUS {PARTITIONS}, REMAINDER {remainder})'
+        )
+    op.create_index('ix_film_to_actor_actor_id', 'film_to_actor', ['actor_id'])
+    op.execute(
+        f'INSERT INTO film_to_actor ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM film_to_actor_unpartitioned WHERE film_id IS NOT NULL'
+    )
+    op.drop_table('film_to_actor_unpartitioned')
+
+
+def downgrade() -> None:
+    op.rename_table('film_to_actor', 'film_to_actor_partitioned')
+    op.execute('ALTER INDEX film_to_actor_pkey RENAME TO film_to_actor_partitioned_pkey')
+    op.create_table('film_to_actor',
+    sa.Column('film_id', sa.Uuid(), nullable=True),
+    sa.Column('actor_id', sa.Uuid(), nullable=True),
+    sa.Column('character', sa.String(), nullable=True),
+    sa.Column('id', sa.Uuid(), nullable=False),
+    sa.ForeignKeyConstraint(['actor_id'], ['actors.id'], ondelete='cascade'),
+    sa.ForeignKeyConstraint(['film_id'], ['films.id'], ondelete='cascade'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute(
+        f'INSERT INTO film_to_actor ({COLUMNS}) '
+        f'SELECT {COLUMNS} FROM film_to_actor_partitioned'
+    )
+    op.drop_table('film_to_actor_partitioned')
@@ -0,0 +1,50 @@
+"""uuid7 ids
+
+New ids are time-ordered UUIDv7 values generated by models.uuid7. This revision adds
+the same generator in SQL as the server default of films, actors and film_to_actor,
+so rows inserted outside the ORM are time-ordered as well.
+
+Existing rows keep their UUIDv4 ids: they are published in page URLs, the change feed
+and consumers' copies, and rewriting them would cascade through every foreign key.
+The old keys stay in the leaf pages they already fill, while new keys are appended to
+the right edge of the index; run REINDEX TABLE CONCURRENTLY once after the upgrade
+to compact the pages split by earlier random inserts.
+
+Revision ID: f2a8d5c3b6e1
+Revises: e4b1c7d2a9f3
+Create Date: 2026-10-19 12:47:05.208611
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f2a8d5c3b6e1'
+down_revision: Union[str, None] = 'e4b1c7d2a9f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('films', 'actors', 'film_to_actor')
+
+
+def upgrade() -> None:
+    # Overwrite the first 48 bits of a random UUID with the Unix time in milliseconds
+    # and turn version bits 0100 into 0111.
+    op.execute(
+        'CREATE FUNCTION uuid_generate_v7() RETURNS uuid AS $$ '
+        'SELECT encode(set_bit(set_bit(overlay(uuid_send(gen_random_uuid()) placing '
+        'substring(int8send(floor(extract(epoch FROM clock_timestamp()) * 1000)::bigint) '
+        'FROM 3) FROM 1 FOR 6), 52, 1), 53, 1), \'hex\')::uuid '
+        '$$ LANGUAGE sql VOLATILE'
+    )
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=sa.text('uuid_generate_v7()'))
+
+
+def downgrade() -> None:
+    for table in TABLES:
+        op.alter_column(table, 'id', server_default=None)
+    op.execute('DROP FUNCTION uuid_generate_v7()')
@@ -1,15 +1,27 @@
 """Module for table models in the database."""
 
 
+import os
+import time
 import uuid
-from datetime import date
+from datetime import date, datetime
 from typing import List, Optional
 
-from sqlalchemy import CheckConstraint, ForeignKey, UniqueConstraint
+from sqlalchemy import CheckConstraint, ForeignKey, Index, UniqueConstraint
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
+from sqlalchemy.sql import func
+from sqlalchemy.types import JSON
 
 POSTER_IMAGE = 'https://eloutput.com/wp-content/uploads/2022/03/imagen-geometria-proyector.png'
 ACTOR_IMAGE = 'https://static10.tgstat.ru/channels/_0/1a/1affec596ab6b9a4dc2003870012508a.jpg'
+NEVER_SYNCED = '1970-01-01'
+NANOSECONDS_PER_MILLISECOND = 1000000
+SUB_MILLISECOND_STEPS = 4096
+UUID7_VERSION = 0x7000
+UUID7_VARIANT = 0b10
+VERSION_FIELD_BITS = 16
+LOW_BITS = 64
+RANDOM_BITS = 62
 
 
 class Base(DeclarativeBase):
@@ -18,10 +30,28 @@ class Base(DeclarativeBase):
     pass
 
 
+def uuid7() -> uuid.UUID:
+    """
+    Generate a time-ordered UUID version 7 (RFC 9562).
+
+    48 bits of Unix time in milliseconds are followed by 12 bits of sub-millisecond time
+    and 62 random bits, so ids generated later sort after earlier ones and new rows are
+    appended to the right edge of the primary key index.
+
+    Returns:
+        uuid.UUID: The generated UUID.
+    """
+    milliseconds, nanoseconds = divmod(time.time_ns(), NANOSECONDS_PER_MILLISECOND)
+    sub_millisecond = nanoseconds * SUB_MILLISECOND_STEPS // NANOSECONDS_PER_MILLISECOND
+    random_bits = int.from_bytes(os.urandom(8), 'big') >> 2
+    high = (milliseconds << VERSION_FIELD_BITS) | UUID7_VERSION | sub_millisecond
+    return uuid.UUID(int=(high << LOW_BITS) | (UUID7_VARIANT << RANDOM_BITS) | random_bits)
+
+
 class IDMixin:
     """Mixin class for the field id."""
 
-    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(primary_key=True, default=uuid7)
 
 
 class Film(Base, IDMixin):
@@ -35,6 +65,7 @@ class Film(Base, IDMixin):
     year: Mapped[Optional[int]] = mapped_column(nullable=True)
     poster: Mapped[Optional[str]] = mapped_column(nullable=True, default=POSTER_IMAGE)
     country: Mapped[Optional[str]] = mapped_column(nullable=True)
+    last_synced_at: Mapped[datetime] = mapped_column(server_default=NEVER_SYNCED, index=True)
 
     actors: Mapped[List['Actor']] = relationship(
         'Actor', secondary='film_to_actor', back_populates='films',
@@ -62,6 +93,7 @@ class Actor(Base, IDMixin):
     photo: Mapped[Optional[str]] = mapped_column(nullable=True, default=ACTOR_IMAGE)
     birth_date: Mapped[Optional[date]] = mapped_column(nullable=True)
     place_of_birth: Mapped[Optional[str]] = mapped_column(nullable=True)
+    last_synced_at: Mapped[datetime] = mapped_column(server_default=NEVER_SYNCED, index=True)
 
     films: Mapped[List['Film']] = relationship(
         'Film', secondary='film_to_actor', back_populates='actors',
@@ -75,16 +107,96 @@ class Actor(Base, IDMixin):
 
 
 class FilmToActor(Base, IDMixin):
-    """Class for the table film_to_actor."""
+    """
+    Class for the table film_to_actor, hash-partitioned by film_id.
+
+    The table key is (film_id, id) because a partitioned table's key has to include
+    film_id, but the ORM identifies links by id alone, so updates by id keep working
+    and may move a link to another film.
+    """
 
     __tablename__ = 'film_to_actor'
 
     film_id: Mapped['Film'] = mapped_column(
         ForeignKey('films.id', ondelete='cascade'),
-        nullable=True,
+        primary_key=True,
     )
     actor_id: Mapped['Actor'] = mapped_column(
         ForeignKey('actors.id', ondelete='cascade'),
         nullable=True,
+        index=True,
     )
     character: Mapped[str] = mapped_column(nullable=True)
+
+    __table_args__ = (
+        {'postgresql_partition_by': 'HASH (film_id)'},
+    )
+    __mapper_args__ = {'primary_key': ['id']}
+
+
+class CatalogueVersion(Base):
+    """Class for the single-row table catalogue_version, bumped by every catalogue write."""
+
+    __tablename__ = 'catalogue_version'
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    version: Mapped[int] = mapped_column(default=0)
+
+
+class Change(Base):
+    """Class for the table changes, the ordered log of catalogue writes."""
+
+    __tablename__ = 'changes'
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    table_name: Mapped[str] = mapped_column()
+    row_id: Mapped[uuid.UUID] = mapped_column()
+    operation: Mapped[str] = mapped_column()
+    row_data: Mapped[dict] = mapped_column(JSON)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
+
+    __table_args__ = (
+        Index('changes_table_name_row_id', 'table_name', 'row_id'),
+    )
+
+
+class CastImport(Base):
+    """Class for the table cast_imports, the progress of a paged cast import per film."""
+
+    __tablename__ = 'cast_imports'
+
+    film_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey('films.id', ondelete='cascade'),
+        primary_key=True,
+    )
+    total: Mapped[int] = mapped_column()
+    imported: Mapped[int] = mapped_column(default=0)
+    status: Mapped[str] = mapped_column(default='running')
+    pending: Mapped[list] = mapped_column(JSON, default=list)
+    failed: Mapped[list] = mapped_column(JSON, default=list, server_default='[]')
+
+
+class SimilarFilm(Base):
+    """Class for the table similar_films, the precomputed most similar films of every film."""
+
+    __tablename__ = 'similar_films'
+
+    film_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey('films.id', ondelete='cascade'),
+        primary_key=True,
+    )
+    similar_film_id: Mapped[uuid.UUID] = mapped_column(
+        ForeignKey('films.id', ondelete='cascade'),
+        primary_key=True,
+    )
+    score: Mapped[float] = mapped_column()
+    shared_actors: Mapped[int] = mapped_column()
+
+
+class ConsumerCursor(Base):
+    """Class for the table consumer_cursors, the change feed position of internal consumers."""
+
+    __tablename__ = 'consumer_cursors'
+
+    consumer: Mapped[str] = mapped_column(primary_key=True)
+    cursor: Mapped[int] = mapped_column(default=0)
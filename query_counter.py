@@ -0,0 +1,129 @@
+"""A module for counting SQL statements per request or per function, to keep N+1 queries out."""
+
+
+import json
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterator
+
+import flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+COUNT_HEADER = 'X-Query-Count'
+STATEMENTS_HEADER = 'X-Query-Statements'
+
+_captured: ContextVar[list | None] = ContextVar('captured', default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Exception raised when a block of code executes more statements than its budget."""
+
+    def __init__(self, budget: int, statements: list) -> None:
+        """
+        Initialize the QueryBudgetExceeded exception with the captured statements.
+
+        Args:
+            budget (int): The allowed number of statements.
+            statements (list): The statements executed by the block.
+        """
+        executed = len(statements)
+        captured = '\n'.join(
+            f'{number}. {statement}' for number, statement in enumerate(statements, start=1)
+        )
+        super().__init__(f'{executed} statements executed, budget is {budget}:\n{captured}')
+
+
+def _record(conn, cursor, statement: str, *args) -> None:
+    """
+    Append a statement to the capture of the current context, as a before_cursor_execute listener.
+
+    Statements of connections with the query_count=False execution option are not captured.
+
+    Args:
+        conn: The connection.
+        cursor: The DBAPI cursor.
+        statement (str): The SQL statement.
+        args: The parameters, the execution context and the executemany flag.
+    """
+    captured = _captured.get()
+    if captured is not None and conn.get_execution_options().get('query_count', True):
+        captured.append(statement)
+
+
+def install(engine: Engine) -> None:
+    """
+    Install the statement counter on an engine.
+
+    Args:
+        engine (Engine): The engine to instrument.
+    """
+    if not event.contains(engine, 'before_cursor_execute', _record):
+        event.listen(engine, 'before_cursor_execute', _record)
+
+
+@contextmanager
+def count_queries(budget: int | None = None) -> Iterator[list]:
+    """
+    Capture the statements executed in the current context by instrumented engines.
+
+    Args:
+        budget (int | None): The allowed number of statements, None only counts.
+
+    Yields:
+        list: The captured statements, filled while the block runs.
+
+    Raises:
+        QueryBudgetExceeded: If the block executed more statements than the budget.
+    """
+    captured = []
+    token = _captured.set(captured)
+    try:
+        yield captured
+    finally:
+        _captured.reset(token)
+    if budget is not None and len(captured) > budget:
+        raise QueryBudgetExceeded(budget, captured)
+
+
+def query_budget(budget: int) -> Callable:
+    """
+    Wrap a function, for example from db.py, so that it fails when it exceeds a query budget.
+
+    Args:
+        budget (int): The allowed number of statements per call.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(function: Callable) -> Callable:
+        @wraps(function)
+        def wrapper(*args, **kwargs):
+            with count_queries(budget):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def start_request() -> None:
+    """Start capturing the statements of the request, as a Flask before_request hook."""
+    flask.g.query_statements = []
+    flask.g.query_token = _captured.set(flask.g.query_statements)
+
+
+def finish_request(response: flask.Response) -> flask.Response:
+    """
+    Report the statements of the request in response headers, as a Flask after_request hook.
+
+    Args:
+        response (Response): The response of the request.
+
+    Returns:
+        Response: The response with the statement count and the statements as a JSON list.
+    """
+    _captured.reset(flask.g.query_token)
+    statements = flask.g.query_statements
+    response.headers[COUNT_HEADER] = str(len(statements))
+    response.headers[STATEMENTS_HEADER] = json.dumps(statements)
+    return response
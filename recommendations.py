@@ -0,0 +1,365 @@
+"""A module for the precomputed index of similar films, based on shared cast."""
+
+
+import heapq
+import time
+from collections import Counter, defaultdict
+from uuid import UUID
+
+from sqlalchemy import delete, insert, or_, select
+from sqlalchemy.orm import Session
+
+import config
+from changes import latest_change_id, read_changes
+from models import ConsumerCursor, Film, FilmToActor, SimilarFilm
+
+CONSUMER = 'similar_films'
+NO_DETAILS = (None, None)
+
+
+def load_casts(session: Session, film_ids: set | None = None) -> dict[UUID, set]:
+    """
+    Load the actor ids of film casts.
+
+    Args:
+        session (Session): The current database session.
+        film_ids (set | None): The films to load, None for all films.
+
+    Returns:
+        dict[UUID, set]: The actor ids per film.
+    """
+    query = select(FilmToActor.film_id, FilmToActor.actor_id).where(
+        FilmToActor.actor_id.is_not(None),
+    )
+    if film_ids is not None:
+        query = query.where(FilmToActor.film_id.in_(film_ids))
+    casts = defaultdict(set)
+    for film_id, actor_id in session.execute(query):
+        casts[film_id].add(actor_id)
+    return casts
+
+
+def load_details(session: Session, film_ids: set | None = None) -> dict[UUID, tuple]:
+    """
+    Load the year and the country of films.
+
+    Args:
+        session (Session): The current database session.
+        film_ids (set | None): The films to load, None for all films.
+
+    Returns:
+        dict[UUID, tuple]: The year and the country per film.
+    """
+    query = select(Film.id, Film.year, Film.country)
+    if film_ids is not None:
+        query = query.where(Film.id.in_(film_ids))
+    return {film_id: (year, country) for film_id, year, country in session.execute(query)}
+
+
+def score(shared: int, sizes: tuple, details: tuple, weights: tuple) -> float:
+    """
+    Score the similarity of two films.
+
+    The Jaccard index of the casts is raised by up to the year weight for close years
+    and by the country weight for the same country; a weight of 0 ignores the attribute.
+
+    Args:
+        shared (int): The number of shared actors.
+        sizes (tuple): The cast sizes of both films.
+        details (tuple): The (year, country) of both films.
+        weights (tuple): The year weight and the country weight.
+
+    Returns:
+        float: The similarity score.
+    """
+    jaccard = shared / (sum(sizes) - shared)
+    (year, country), (other_year, other_country) = details
+    bonus = 0
+    if year and other_year:
+        closeness = 1 - abs(year - other_year) / config.SIMILAR_YEAR_SCALE
+        bonus += weights[0] * max(closeness, 0)
+    if country and country == other_country:
+        bonus += weights[1]
+    return jaccard * (1 + bonus)
+
+
+def index_by_actor(casts: dict) -> dict[UUID, list]:
+    """
+    Invert the casts into the films of every actor.
+
+    Args:
+        casts (dict): The actor ids per film.
+
+    Returns:
+        dict[UUID, list]: The film ids per actor.
+    """
+    films_by_actor = defaultdict(list)
+    for film_id, cast in casts.items():
+        for actor_id in cast:
+            films_by_actor[actor_id].append(film_id)
+    return films_by_actor
+
+
+def rank(film_id: UUID, casts: dict, films_by_actor: dict, details: dict, weights: tuple) -> list:
+    """
+    Rank the films sharing an actor with a film and keep the top SIMILAR_FILMS_K.
+
+    Args:
+        film_id (UUID): The film.
+        casts (dict): The actor ids per film.
+        films_by_actor (dict): The film ids per actor.
+        details (dict): The (year, country) per film.
+        weights (tuple): The year weight and the country weight.
+
+    Returns:
+        list: The (score, shared actors, similar film id) of the most similar films.
+    """
+    cast = casts.get(film_id, ())
+    shared_counts = Counter(
+        other_id for actor_id in cast for other_id in films_by_actor[actor_id]
+    )
+    shared_counts.pop(film_id, None)
+    film_details = details.get(film_id, NO_DETAILS)
+    scored = []
+    for other_id, shared in shared_counts.items():
+        sizes = (len(cast), len(casts[other_id]))
+        pair_details = (film_details, details.get(other_id, NO_DETAILS))
+        scored.append((score(shared, sizes, pair_details, weights), shared, other_id))
+    return heapq.nlargest(config.SIMILAR_FILMS_K, scored)
+
+
+def top_similar(film_ids: set, casts: dict, details: dict, weights: tuple) -> list[dict]:
+    """
+    Compute the top similar films of films.
+
+    Args:
+        film_ids (set): The films to compute the lists for.
+        casts (dict): The casts of these films and of every film sharing an actor with them.
+        details (dict): The (year, country) of the films in casts.
+        weights (tuple): The year weight and the country weight.
+
+    Returns:
+        list[dict]: The similar_films rows.
+    """
+    films_by_actor = index_by_actor(casts)
+    rows = []
+    for film_id in film_ids:
+        rows.extend(
+            {
+                'film_id': film_id,
+                'similar_film_id': similar_id,
+                'score': similarity,
+                'shared_actors': shared,
+            }
+            for similarity, shared, similar_id in rank(
+                film_id, casts, films_by_actor, details, weights,
+            )
+        )
+    return rows
+
+
+def save(session: Session, film_ids: set | None, rows: list[dict], cursor: int) -> None:
+    """
+    Replace the similar films lists and move the consumer cursor in one transaction.
+
+    Args:
+        session (Session): The current database session.
+        film_ids (set | None): The films whose lists are replaced, None for all films.
+        rows (list[dict]): The new similar_films rows.
+        cursor (int): The id of the last change the lists reflect.
+    """
+    replaced = delete(SimilarFilm)
+    if film_ids is not None:
+        replaced = replaced.where(SimilarFilm.film_id.in_(film_ids))
+    session.execute(replaced)
+    if rows:
+        session.execute(insert(SimilarFilm), rows)
+    consumer = session.get(ConsumerCursor, CONSUMER)
+    if consumer is None:
+        session.add(ConsumerCursor(consumer=CONSUMER, cursor=cursor))
+    else:
+        consumer.cursor = cursor
+    session.commit()
+
+
+def recompute_all(session: Session, weights: tuple, cursor: int) -> tuple[set, list]:
+    """
+    Recompute and replace the similar films of every film.
+
+    Args:
+        session (Session): The current database session.
+        weights (tuple): The year weight and the country weight.
+        cursor (int): The id of the last change the lists reflect.
+
+    Returns:
+        tuple[set, list]: The recomputed films and the stored similar_films rows.
+    """
+    casts = load_casts(session)
+    rows = top_similar(set(casts), casts, load_details(session), weights)
+    save(session, None, rows, cursor)
+    return set(casts), rows
+
+
+def rebuild(session: Session, weights: tuple) -> dict:
+    """
+    Recompute the similar films of every film.
+
+    The change log head is read first, so links written during the rebuild are
+    picked up by the next update.
+
+    Args:
+        session (Session): The current database session.
+        weights (tuple): The year weight and the country weight.
+
+    Returns:
+        dict: The numbers of films and stored pairs and the elapsed time.
+    """
+    started = time.perf_counter()
+    head = latest_change_id(session)
+    film_ids, rows = recompute_all(session, weights, head)
+    return {'films': len(film_ids), 'pairs': len(rows), 'seconds': time.perf_counter() - started}
+
+
+def written_ids(change: dict) -> tuple:
+    """
+    Take the film and the actor of a changed link, or the id of a changed film.
+
+    Args:
+        change (dict): A change from the change feed.
+
+    Returns:
+        tuple: The film id and the actor id, None where there is none.
+    """
+    row = change['row']
+    if change['table'] == FilmToActor.__tablename__:
+        return tuple(
+            UUID(row[column]) if row.get(column) else None for column in ('film_id', 'actor_id')
+        )
+    if change['table'] == Film.__tablename__:
+        return UUID(change['row_id']), None
+    return None, None
+
+
+def changed_ids(log: list[dict]) -> tuple[set, set]:
+    """
+    Collect the films and the actors of changed links and the changed films.
+
+    Args:
+        log (list[dict]): The changes from the change feed.
+
+    Returns:
+        tuple[set, set]: The film ids and the actor ids.
+    """
+    film_ids = set()
+    actor_ids = set()
+    for change in log:
+        film_id, actor_id = written_ids(change)
+        if film_id:
+            film_ids.add(film_id)
+            actor_ids.add(actor_id)
+    actor_ids.discard(None)
+    return film_ids, actor_ids
+
+
+def affected_films(session: Session, log: list[dict]) -> set:
+    """
+    Find the films whose similar films may have changed.
+
+    These are the films of written links, the films whose year or country changed,
+    and every film sharing an actor with them, including the actor of a deleted link.
+    Deleting a film or an actor logs the deletes of its links, so the films that
+    shared its cast are found through their actors.
+
+    Args:
+        session (Session): The current database session.
+        log (list[dict]): The changes from the change feed.
+
+    Returns:
+        set: The film ids.
+    """
+    film_ids, actor_ids = changed_ids(log)
+    if not film_ids:
+        return film_ids
+    actors = select(FilmToActor.actor_id).where(FilmToActor.film_id.in_(film_ids))
+    neighbours = session.scalars(
+        select(FilmToActor.film_id).where(
+            or_(FilmToActor.actor_id.in_(actors), FilmToActor.actor_id.in_(actor_ids)),
+        ).distinct(),
+    )
+    return film_ids.union(neighbours)
+
+
+def update_batch(session: Session, log: list[dict], weights: tuple) -> set:
+    """
+    Recompute the similar films of the films affected by a page of changes.
+
+    Args:
+        session (Session): The current database session.
+        log (list[dict]): The changes, in commit order.
+        weights (tuple): The year weight and the country weight.
+
+    Returns:
+        set: The recomputed films.
+    """
+    film_ids = affected_films(session, log)
+    actors = select(FilmToActor.actor_id).where(FilmToActor.film_id.in_(film_ids))
+    candidates = select(FilmToActor.film_id).where(FilmToActor.actor_id.in_(actors))
+    casts = load_casts(session, film_ids.union(session.scalars(candidates)))
+    rows = top_similar(film_ids, casts, load_details(session, set(casts)), weights)
+    save(session, film_ids, rows, log[-1]['id'])
+    return film_ids
+
+
+def update(session: Session, weights: tuple) -> dict:
+    """
+    Recompute the similar films of the films affected by the changes since the last run.
+
+    Args:
+        session (Session): The current database session.
+        weights (tuple): The year weight and the country weight.
+
+    Returns:
+        dict: The numbers of read changes and recomputed films and the elapsed time.
+    """
+    started = time.perf_counter()
+    consumer = session.get(ConsumerCursor, CONSUMER)
+    log = read_changes(session, consumer.cursor if consumer else 0, config.CHANGES_PAGE_SIZE)
+    read_count = 0
+    recomputed = set()
+    while log:
+        read_count += len(log)
+        recomputed.update(update_batch(session, log, weights))
+        log = read_changes(session, log[-1]['id'], config.CHANGES_PAGE_SIZE)
+    return {
+        'changes': read_count,
+        'films': len(recomputed),
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def get_similar_films(film_id: UUID, session: Session) -> list[dict]:
+    """
+    Retrieve the precomputed similar films of a film, the most similar first.
+
+    Args:
+        film_id (UUID): The film id.
+        session (Session): The current database session.
+
+    Returns:
+        list[dict]: The similar films with their score and number of shared actors.
+    """
+    query = select(Film, SimilarFilm.score, SimilarFilm.shared_actors).join(
+        SimilarFilm, SimilarFilm.similar_film_id == Film.id,
+    ).where(SimilarFilm.film_id == film_id).order_by(SimilarFilm.score.desc())
+    similar_films = []
+    for similar_film, similarity, shared in session.execute(query):
+        similar_films.append({
+            'id': similar_film.id,
+            'title': similar_film.title,
+            'year': similar_film.year,
+            'country': similar_film.country,
+            'poster': similar_film.poster,
+            'score': similarity,
+            'shared_actors': shared,
+        })
+    return similar_films
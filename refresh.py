@@ -0,0 +1,194 @@
+"""A module for incrementally re-syncing stale films and actors from the external API."""
+
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+from functools import partial
+from types import MappingProxyType
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from changes import record_changes
+from imdb_api import get_actor_data, get_film_data
+from models import Actor, Film
+
+FETCHERS = MappingProxyType({Film: get_film_data, Actor: get_actor_data})
+SYNCED_FIELDS = MappingProxyType({
+    Film: ('title', 'imdb_rating', 'year', 'poster', 'country'),
+    Actor: ('full_name', 'height', 'photo', 'birth_date', 'place_of_birth'),
+})
+SYNC_ONLY_KEYS = ('id', 'last_synced_at')
+PARSERS = MappingProxyType({date: date.fromisoformat, datetime: datetime.fromisoformat})
+
+
+def fetch_safely(fetch, imdb_id: str) -> dict | None:
+    """
+    Fetch the data of one row, treating any API failure as a missing result.
+
+    Args:
+        fetch: The imdb_api function fetching the data by imdb_id.
+        imdb_id (str): The IMDb ID of the row.
+
+    Returns:
+        dict | None: The fetched data or None if it could not be fetched.
+    """
+    try:
+        return fetch(imdb_id)
+    except Exception:
+        return None
+
+
+def fetch_all(model, imdb_ids: list, workers: int) -> list:
+    """
+    Fetch the data of many rows on a bounded thread pool.
+
+    imdb_api.quota keeps the calls of all threads within the API rate.
+
+    Args:
+        model: Film or Actor.
+        imdb_ids (list): The IMDb IDs of the rows.
+        workers (int): The maximum number of concurrent API calls.
+
+    Returns:
+        list: The fetched data, or None for every row that could not be fetched.
+    """
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(partial(fetch_safely, FETCHERS[model]), imdb_ids))
+
+
+def coerce(column, api_value):
+    """
+    Convert an API value to the Python type of a column, as the database would store it.
+
+    Args:
+        column: The table column.
+        api_value: The fetched value, for example a year or a rating as a string.
+
+    Returns:
+        The converted value, or the value itself if it is empty or cannot be converted.
+    """
+    python_type = column.type.python_type
+    if api_value is None or isinstance(api_value, python_type):
+        return api_value
+    parse = PARSERS.get(python_type, python_type)
+    try:
+        return parse(api_value)
+    except (TypeError, ValueError):
+        return api_value
+
+
+def changed_fields(class_object, fresh_data: dict, fields: tuple) -> dict:
+    """
+    Compare a stored row with freshly fetched data converted to the column types.
+
+    Args:
+        class_object: The stored ORM object.
+        fresh_data (dict): The fetched data.
+        fields (tuple): The fields kept in sync with the API.
+
+    Returns:
+        dict: The fields whose values differ, with the converted fresh values.
+    """
+    columns = class_object.__table__.columns
+    fresh_values = {
+        field: coerce(columns[field], fresh_data[field])
+        for field in fields
+        if field in fresh_data
+    }
+    return {
+        field: fresh_value
+        for field, fresh_value in fresh_values.items()
+        if getattr(class_object, field) != fresh_value
+    }
+
+
+def sync_mappings(model, stale: list, fetched: list) -> list[dict]:
+    """
+    Build the bulk UPDATE rows of a batch: a new last_synced_at plus the changed fields.
+
+    Args:
+        model: Film or Actor.
+        stale (list): The stored ORM objects.
+        fetched (list): The fetched data of each object, None where the fetch failed.
+
+    Returns:
+        list[dict]: The rows by primary key.
+    """
+    synced_at = datetime.now()
+    mappings = []
+    for stored, fresh_data in zip(stale, fetched):
+        changed = {}
+        if fresh_data:
+            changed = changed_fields(stored, fresh_data, SYNCED_FIELDS[model])
+        mappings.append({'id': stored.id, 'last_synced_at': synced_at, **changed})
+    return mappings
+
+
+def refresh_batch(session: Session, model, batch_size: int, workers: int) -> dict:
+    """
+    Re-fetch the stalest rows of a model and write back only what has changed.
+
+    Unchanged rows only get a new last_synced_at, all in one bulk UPDATE by primary key.
+    Rows that could not be fetched get a new last_synced_at too, so they are retried
+    after the other rows instead of blocking every batch.
+
+    Args:
+        session (Session): The current database session.
+        model: Film or Actor.
+        batch_size (int): The maximum number of rows to refresh.
+        workers (int): The maximum number of concurrent API calls.
+
+    Returns:
+        dict: The numbers of checked, changed and failed rows.
+    """
+    stale = session.scalars(
+        select(model).where(
+            model.imdb_id.is_not(None),
+        ).order_by(model.last_synced_at).limit(batch_size),
+    ).all()
+    fetched = fetch_all(model, [stored.imdb_id for stored in stale], workers)
+    mappings = sync_mappings(model, stale, fetched)
+    changed_ids = [
+        mapping['id'] for mapping in mappings if len(mapping) > len(SYNC_ONLY_KEYS)
+    ]
+    if mappings:
+        session.execute(update(model), mappings)
+    if changed_ids:
+        record_changes(
+            session,
+            'update',
+            session.scalars(
+                select(model).where(model.id.in_(changed_ids)),
+                execution_options={'populate_existing': True},
+            ).all(),
+        )
+    session.commit()
+    return {
+        'checked': len(stale),
+        'changed': len(changed_ids),
+        'failed': len([fresh_data for fresh_data in fetched if not fresh_data]),
+    }
+
+
+def refresh(session: Session, batch_size: int, workers: int) -> dict:
+    """
+    Refresh one batch of the stalest films and one batch of the stalest actors.
+
+    Args:
+        session (Session): The current database session.
+        batch_size (int): The maximum number of rows to refresh per model.
+        workers (int): The maximum number of concurrent API calls.
+
+    Returns:
+        dict: The statistics per table, including rows per second.
+    """
+    report = {}
+    for model in (Film, Actor):
+        started = time.perf_counter()
+        stats = refresh_batch(session, model, batch_size, workers)
+        elapsed = time.perf_counter() - started
+        stats['rows_per_second'] = stats['checked'] / elapsed if elapsed else 0
+        report[model.__tablename__] = stats
+    return report
@@ -0,0 +1,4 @@
+#!/bin/bash
+
+# Let the postgres-replica service stream WAL from this primary.
+echo "host replication all all scram-sha-256" >> "$PGDATA/pg_hba.conf"
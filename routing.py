@@ -0,0 +1,83 @@
+"""A module for routing catalogue reads to read replicas."""
+
+
+import itertools
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import SQLAlchemyError
+
+
+def ping(engine: Engine) -> bool:
+    """
+    Check that a database accepts connections and answers queries.
+
+    The check is left out of the query counts of query_counter.
+
+    Args:
+        engine (Engine): The engine of the database.
+
+    Returns:
+        bool: True if the database answered.
+    """
+    try:
+        with engine.connect() as connection:
+            connection.execution_options(query_count=False).execute(text('SELECT 1'))
+    except SQLAlchemyError:
+        return False
+    return True
+
+
+class ReplicaPool:
+    """Round-robin choice of a healthy read replica, falling back to the primary."""
+
+    def __init__(self, primary: Engine, replicas: list[Engine], check_interval: float) -> None:
+        """
+        Initialize the pool.
+
+        Args:
+            primary (Engine): The engine of the primary, used when no replica is healthy.
+            replicas (list[Engine]): The engines of the read replicas.
+            check_interval (float): How long a health check result is trusted, in seconds.
+        """
+        self.primary = primary
+        self.replicas = replicas
+        self.check_interval = check_interval
+        self._turns = itertools.count()
+        self._checks = {}
+
+    def reader(self) -> Engine:
+        """
+        Choose the engine for the next read.
+
+        Replicas take turns; a replica that failed its last health check is skipped
+        until the check is repeated after check_interval.
+
+        Returns:
+            Engine: The next healthy replica, or the primary if none is healthy.
+        """
+        if not self.replicas:
+            return self.primary
+        turn = next(self._turns) % len(self.replicas)
+        for replica in self.replicas[turn:] + self.replicas[:turn]:
+            if self.is_healthy(replica):
+                return replica
+        return self.primary
+
+    def is_healthy(self, replica: Engine) -> bool:
+        """
+        Return the health of a replica, checking it again when the last result is too old.
+
+        Args:
+            replica (Engine): The engine of the replica.
+
+        Returns:
+            bool: True if the replica answered its last health check.
+        """
+        checked_at, healthy = self._checks.get(replica, (None, False))
+        now = time.monotonic()
+        if checked_at is None or now - checked_at >= self.check_interval:
+            healthy = ping(replica)
+            self._checks[replica] = (now, healthy)
+        return healthy
@@ -2,4 +2,6 @@
 
 alembic upgrade head
 
-exec python3 -m gunicorn --bind 0.0.0.0:5000 --workers=4 app:app
\ No newline at end of file
+python3 -m flask --app app compile-templates
+
+exec python3 -m gunicorn --bind 0.0.0.0:5000 --workers=4 --threads="${GUNICORN_THREADS:-8}" app:app
@@ -0,0 +1,499 @@
+"""A module for serving catalogue reads from a memory-mapped columnar snapshot.
+
+The snapshot is a single file holding films, actors and film_to_actor as columns:
+ids as raw 16-byte UUIDs sorted for binary search, numbers and dates as fixed-width
+arrays and every string as an index into one interned string table. Gunicorn workers
+map the same file read-only, so the page cache keeps a single copy per host.
+"""
+
+
+import bisect
+import fcntl
+import math
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from datetime import date
+from pathlib import Path
+from types import MappingProxyType
+from uuid import UUID
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models import Actor, CatalogueVersion, Film, FilmToActor
+
+MAGIC = b'FASNAP01'
+HEADER = struct.Struct('<8sQIIII')
+SECTION = struct.Struct('<QQ')
+ALIGNMENT = 8
+UUID_SIZE = 16
+NONE_INT = -9223372036854775808
+TYPECODES = MappingProxyType({'str': 'I', 'float': 'd', 'int': 'q', 'date': 'q'})
+NULLS = MappingProxyType({'float': math.nan, 'int': NONE_INT, 'date': NONE_INT})
+FILM_FIELDS = (
+    ('imdb_id', 'str'),
+    ('title', 'str'),
+    ('imdb_rating', 'float'),
+    ('year', 'int'),
+    ('poster', 'str'),
+    ('country', 'str'),
+)
+ACTOR_FIELDS = (
+    ('imdb_id', 'str'),
+    ('full_name', 'str'),
+    ('height', 'str'),
+    ('photo', 'str'),
+    ('birth_date', 'date'),
+    ('place_of_birth', 'str'),
+)
+
+
+def bump_version(session: Session) -> None:
+    """
+    Increment the catalogue version inside the current write transaction.
+
+    Args:
+        session (Session): The session of the write transaction.
+    """
+    session.execute(update(CatalogueVersion).values(version=CatalogueVersion.version + 1))
+
+
+def _encode(kind: str, column_values: list, strings: dict) -> bytes:
+    """
+    Encode a column as a fixed-width array, using sentinels for NULL.
+
+    Args:
+        kind (str): The kind of the column: 'str', 'float', 'int' or 'date'.
+        column_values (list): The values of the column.
+        strings (dict): The interned strings, mapping each string to its index.
+
+    Returns:
+        bytes: The encoded column.
+    """
+    if kind == 'str':
+        codes = [strings.setdefault(cell, len(strings)) for cell in column_values]
+        return array(TYPECODES[kind], codes).tobytes()
+    if kind == 'date':
+        column_values = [cell and cell.toordinal() for cell in column_values]
+    codes = [NULLS[kind] if cell is None else cell for cell in column_values]
+    return array(TYPECODES[kind], codes).tobytes()
+
+
+def _encode_table(rows: list, fields: tuple, strings: dict) -> list[bytes]:
+    """
+    Encode rows as the id section followed by one section per field.
+
+    Args:
+        rows (list): The rows of an id followed by the field values, sorted by id.
+        fields (tuple): The names and kinds of the fields after the id.
+        strings (dict): The interned strings, mapping each string to its index.
+
+    Returns:
+        list[bytes]: The encoded sections.
+    """
+    sections = [b''.join(row[0].bytes for row in rows)]
+    for position, (_, kind) in enumerate(fields, start=1):
+        sections.append(_encode(kind, [row[position] for row in rows], strings))
+    return sections
+
+
+def _encode_links(film_ids: list, actor_ids: list, links: list, strings: dict) -> list[bytes]:
+    """
+    Encode film_to_actor as per-film ranges of actor indexes and characters.
+
+    Args:
+        film_ids (list): The sorted film ids.
+        actor_ids (list): The sorted actor ids.
+        links (list): Rows of film id, actor id and character.
+        strings (dict): The interned strings, mapping each string to its index.
+
+    Returns:
+        list[bytes]: The range starts, actor indexes and characters sections.
+    """
+    film_index = {film_id: position for position, film_id in enumerate(film_ids)}
+    actor_index = {actor_id: position for position, actor_id in enumerate(actor_ids)}
+    links = sorted(
+        (film_index[film_id], actor_index[actor_id], character)
+        for film_id, actor_id, character in links
+        if film_id in film_index and actor_id in actor_index
+    )
+    film_positions = [link[0] for link in links]
+    starts = array('I', [
+        bisect.bisect_left(film_positions, position) for position in range(len(film_ids) + 1)
+    ])
+    return [
+        starts.tobytes(),
+        array('I', [link[1] for link in links]).tobytes(),
+        _encode('str', [link[2] for link in links], strings),
+    ]
+
+
+def _encode_strings(strings: dict) -> list[bytes]:
+    """
+    Encode the interned strings as an offsets section and a UTF-8 data section.
+
+    Args:
+        strings (dict): The interned strings, with None at index 0.
+
+    Returns:
+        list[bytes]: The offsets and data sections.
+    """
+    encoded = [string.encode() for string in list(strings)[1:]]
+    offsets = array('I', [0])
+    for encoded_string in encoded:
+        offsets.append(offsets[-1] + len(encoded_string))
+    return [offsets.tobytes(), b''.join(encoded)]
+
+
+def write_snapshot(path: Path, version: int, films: list, actors: list, links: list) -> None:
+    """
+    Write a snapshot file atomically.
+
+    Args:
+        path (Path): The path of the snapshot file.
+        version (int): The catalogue version the rows were read at.
+        films (list): Rows of film id followed by the FILM_FIELDS values.
+        actors (list): Rows of actor id followed by the ACTOR_FIELDS values.
+        links (list): Rows of film id, actor id and character.
+    """
+    films = sorted(films, key=lambda film: film[0].bytes)
+    actors = sorted(actors, key=lambda actor: actor[0].bytes)
+    strings = {None: 0}
+    sections = _encode_table(films, FILM_FIELDS, strings)
+    sections.extend(_encode_table(actors, ACTOR_FIELDS, strings))
+    sections.extend(_encode_links(
+        [film[0] for film in films], [actor[0] for actor in actors], links, strings,
+    ))
+    sections.extend(_encode_strings(strings))
+
+    offset = HEADER.size + SECTION.size * len(sections)
+    layout = []
+    for section in sections:
+        offset += -offset % ALIGNMENT
+        layout.append(SECTION.pack(offset, len(section)))
+        offset += len(section)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent)
+    with os.fdopen(fd, 'wb') as snapshot_file:
+        snapshot_file.write(HEADER.pack(
+            MAGIC, version, len(films), len(actors), len(links), len(sections),
+        ))
+        snapshot_file.write(b''.join(layout))
+        for section_data in sections:
+            snapshot_file.write(bytes(-snapshot_file.tell() % ALIGNMENT))
+            snapshot_file.write(section_data)
+    os.replace(tmp_name, path)
+
+
+def build_snapshot(session: Session, path: Path) -> None:
+    """
+    Read the catalogue from the database and write it as a snapshot.
+
+    The version is read before the rows, so the rows may only be newer than the version,
+    which at worst causes one extra rebuild.
+
+    Args:
+        session (Session): The session used to read the catalogue.
+        path (Path): The path of the snapshot file.
+    """
+    version = session.scalar(select(CatalogueVersion.version)) or 0
+    film_columns = [getattr(Film, field) for field, _ in FILM_FIELDS]
+    actor_columns = [getattr(Actor, field) for field, _ in ACTOR_FIELDS]
+    films = session.execute(select(Film.id, *film_columns)).all()
+    actors = session.execute(select(Actor.id, *actor_columns)).all()
+    links = session.execute(
+        select(FilmToActor.film_id, FilmToActor.actor_id, FilmToActor.character),
+    ).all()
+    session.rollback()
+    write_snapshot(path, version, films, actors, links)
+
+
+class _Table:
+    """Columns of one table inside a mapped snapshot."""
+
+    def __init__(self, sections, fields: tuple, size: int, decode_string) -> None:
+        """
+        Take the sections of the table from the section iterator.
+
+        Args:
+            sections: The iterator over the sections of the file.
+            fields (tuple): The names and kinds of the fields after the id.
+            size (int): The number of rows.
+            decode_string: The function decoding an interned string by its index.
+        """
+        self.size = size
+        self._ids = next(sections)
+        self._fields = fields
+        self._columns = [next(sections).cast(TYPECODES[kind]) for _, kind in fields]
+        self._decode_string = decode_string
+
+    def find(self, row_id: UUID | str) -> int | None:
+        """
+        Binary search the sorted id column.
+
+        Args:
+            row_id (UUID | str): The id to look for.
+
+        Returns:
+            int | None: The row index or None if the id is absent or malformed.
+        """
+        try:
+            key = UUID(str(row_id)).bytes
+        except ValueError:
+            return None
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            if self._id_at(middle) < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.size and self._id_at(low) == key:
+            return low
+        return None
+
+    def row(self, index: int) -> dict:
+        """
+        Decode one row.
+
+        Args:
+            index (int): The row index.
+
+        Returns:
+            dict: The row with the model field names.
+        """
+        row = {'id': UUID(bytes=self._id_at(index))}
+        for (field, kind), column in zip(self._fields, self._columns):
+            row[field] = self._decode(kind, column[index])
+        return row
+
+    def _id_at(self, index: int) -> bytes:
+        """
+        Read the raw id of a row.
+
+        Args:
+            index (int): The row index.
+
+        Returns:
+            bytes: The 16 bytes of the UUID.
+        """
+        start = index * UUID_SIZE
+        return self._ids[start:start + UUID_SIZE].tobytes()
+
+    def _decode(self, kind: str, cell):
+        """
+        Decode a stored value, turning sentinels back into None.
+
+        Args:
+            kind (str): The kind of the column.
+            cell: The stored value.
+
+        Returns:
+            The decoded value.
+        """
+        if kind == 'str':
+            return self._decode_string(cell)
+        if kind == 'float':
+            return None if math.isnan(cell) else cell
+        if cell == NONE_INT:
+            return None
+        return date.fromordinal(cell) if kind == 'date' else cell
+
+
+class Snapshot:
+    """Read-only view of a snapshot file with the same read functions as the db module."""
+
+    def __init__(self, path: Path) -> None:
+        """
+        Map a snapshot file into memory.
+
+        Args:
+            path (Path): The path of the snapshot file.
+
+        Raises:
+            ValueError: If the file is not a snapshot.
+        """
+        with open(path, 'rb') as snapshot_file:
+            self._mmap = mmap.mmap(snapshot_file.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        header = HEADER.unpack_from(view)
+        if header[0] != MAGIC:
+            raise ValueError(f'{path} is not a catalogue snapshot')
+        self.version = header[1]
+        sections = iter([
+            view[section_offset:section_offset + section_size]
+            for section_offset, section_size in SECTION.iter_unpack(
+                view[HEADER.size:HEADER.size + SECTION.size * header[-1]],
+            )
+        ])
+        self._films = _Table(sections, FILM_FIELDS, header[2], self._string)
+        self._actors = _Table(sections, ACTOR_FIELDS, header[3], self._string)
+        starts, link_actors, characters, string_offsets = (
+            next(sections).cast('I') for _ in range(4)
+        )
+        self._starts = starts
+        self._link_actors = link_actors
+        self._characters = characters
+        self._string_offsets = string_offsets
+        self._strings = next(sections)
+
+    def get_all_films(self, session: Session | None = None) -> list[dict]:
+        """
+        Return all films, like db.get_all_films.
+
+        Args:
+            session (Session | None): Unused, kept for parity with the db module.
+
+        Returns:
+            list[dict]: The films with string ids.
+        """
+        films = [self._films.row(index) for index in range(self._films.size)]
+        for film in films:
+            film['id'] = str(film['id'])
+        return films
+
+    def get_all_actors(self, session: Session | None = None) -> list[dict]:
+        """
+        Return all actors, like db.get_all_actors.
+
+        Args:
+            session (Session | None): Unused, kept for parity with the db module.
+
+        Returns:
+            list[dict]: The actors with string ids.
+        """
+        actors = [self._actors.row(index) for index in range(self._actors.size)]
+        for actor_data in actors:
+            actor_data['id'] = str(actor_data['id'])
+        return actors
+
+    def get_film(self, film_id: UUID, session: Session | None = None) -> dict | None:
+        """
+        Return a film by its id, like db.get_film.
+
+        Args:
+            film_id (UUID): The film id.
+            session (Session | None): Unused, kept for parity with the db module.
+
+        Returns:
+            dict | None: The film or None if it does not exist.
+        """
+        index = self._films.find(film_id)
+        return None if index is None else self._films.row(index)
+
+    def get_actor(self, actor_id: UUID, session: Session | None = None) -> dict | None:
+        """
+        Return an actor by its id, like db.get_actor.
+
+        Args:
+            actor_id (UUID): The actor id.
+            session (Session | None): Unused, kept for parity with the db module.
+
+        Returns:
+            dict | None: The actor or None if it does not exist.
+        """
+        index = self._actors.find(actor_id)
+        return None if index is None else self._actors.row(index)
+
+    def get_film_actors(self, film_id: UUID, session: Session | None = None) -> list | None:
+        """
+        Return the actors of a film with their characters, like db.get_film_actors.
+
+        Args:
+            film_id (UUID): The film id.
+            session (Session | None): Unused, kept for parity with the db module.
+
+        Returns:
+            list | None: The actors or None if the film has no actors.
+        """
+        index = self._films.find(film_id)
+        if index is None:
+            return None
+        actors = []
+        for link in range(self._starts[index], self._starts[index + 1]):
+            actor = self._actors.row(self._link_actors[link])
+            actor['character'] = self._string(self._characters[link])
+            actors.append(actor)
+        return actors or None
+
+    def _string(self, code: int) -> str | None:
+        """
+        Decode an interned string.
+
+        Args:
+            code (int): The index of the string, 0 means NULL.
+
+        Returns:
+            str | None: The string.
+        """
+        if not code:
+            return None
+        start, end = self._string_offsets[code - 1], self._string_offsets[code]
+        return str(self._strings[start:end], 'utf-8')
+
+
+class SnapshotStore:
+    """Per-worker holder of the current snapshot, reloaded when the catalogue version changes."""
+
+    def __init__(self, path: Path, check_interval: float) -> None:
+        """
+        Initialize the store without loading the snapshot.
+
+        Args:
+            path (Path): The path of the snapshot file shared by the workers of the host.
+            check_interval (float): How often, in seconds, to compare versions with the database.
+        """
+        self._path = path
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._snapshot = None
+        self._checked_at = -math.inf
+
+    def current(self, session: Session) -> Snapshot:
+        """
+        Return the current snapshot, rebuilding or remapping it after catalogue writes.
+
+        Args:
+            session (Session): The session used to read the version and to rebuild.
+
+        Returns:
+            Snapshot: The snapshot.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - self._checked_at < self._check_interval:
+            return snapshot
+        with self._lock:
+            version = session.scalar(select(CatalogueVersion.version)) or 0
+            if self._snapshot is None or self._snapshot.version < version:
+                self._snapshot = self._load(session, version)
+            self._checked_at = time.monotonic()
+            return self._snapshot
+
+    def _load(self, session: Session, version: int) -> Snapshot:
+        """
+        Map the shared snapshot file, rebuilding it first if it is older than version.
+
+        A file lock makes a single worker on the host rebuild while the others wait.
+
+        Args:
+            session (Session): The session used to rebuild.
+            version (int): The current catalogue version.
+
+        Returns:
+            Snapshot: The snapshot of at least the given version.
+        """
+        with open(f'{self._path}.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                snapshot = Snapshot(self._path)
+            except (FileNotFoundError, ValueError):
+                snapshot = None
+            if snapshot is None or snapshot.version < version:
+                build_snapshot(session, self._path)
+                snapshot = Snapshot(self._path)
+        return snapshot
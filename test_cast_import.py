@@ -0,0 +1,149 @@
+"""Module for paged cast import tests on an in-memory database."""
+
+
+from datetime import datetime
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import cast_import
+import config
+from models import Actor, Film, FilmToActor
+
+CAST_SIZE = 12
+DEPTH = 8
+cast = [
+    {'imdb_id': f'nm{number:07}', 'character': f'Character {number}'}
+    for number in range(CAST_SIZE)
+]
+fetched_ids = []
+
+
+class FakeBackground:
+    """Stand-in for the background executor that records the scheduled imports."""
+
+    def __init__(self) -> None:
+        """Initialize the list of scheduled calls."""
+        self.calls = []
+
+    def submit(self, *args) -> None:
+        """
+        Record a scheduled call instead of running it.
+
+        Args:
+            args: The function and its arguments.
+        """
+        self.calls.append(args)
+
+
+def fake_fetch_all(model, imdb_ids: list, workers: int) -> list:
+    """
+    Imitate fetching actors from the API.
+
+    Args:
+        model: The model of the fetched rows.
+        imdb_ids (list): The IMDb IDs of the actors.
+        workers (int): The maximum number of concurrent API calls.
+
+    Returns:
+        list: The actor data.
+    """
+    fetched_ids.extend(imdb_ids)
+    return [{'imdb_id': imdb_id, 'full_name': f'Actor {imdb_id}'} for imdb_id in imdb_ids]
+
+
+@pytest.fixture(name='session')
+def fake_api_session(memory_session: Session, monkeypatch) -> Session:
+    """
+    Fake the API for an in-memory database.
+
+    Args:
+        memory_session (Session): The session of the in-memory database.
+        monkeypatch: The pytest monkeypatch fixture.
+
+    Returns:
+        Session: The database session.
+    """
+    fetched_ids.clear()
+    monkeypatch.setattr(cast_import, 'get_film_cast', lambda imdb_id: cast)
+    monkeypatch.setattr(cast_import, 'fetch_all', fake_fetch_all)
+    monkeypatch.setattr(cast_import, 'background', FakeBackground())
+    return memory_session
+
+
+def count_links(session: Session) -> int:
+    """
+    Count the imported film_to_actor rows.
+
+    Args:
+        session (Session): The database session.
+
+    Returns:
+        int: The number of rows.
+    """
+    return session.scalar(select(func.count()).select_from(FilmToActor))
+
+
+def test_paged_import(session: Session) -> None:
+    """
+    Test that the first page is imported inline and the rest on demand.
+
+    Args:
+        session (Session): The database session.
+    """
+    session.add(Actor(imdb_id=cast[0]['imdb_id'], full_name='Existing actor'))
+    film = Film(title='Test film', last_synced_at=datetime.now())
+    session.add(film)
+    session.commit()
+
+    cast_import.start(session, film.id, 'tt0111161', DEPTH)
+    assert count_links(session) == config.CAST_PAGE_SIZE
+    assert cast[0]['imdb_id'] not in fetched_ids
+    assert len(cast_import.background.calls) == 1
+    assert cast_import.get_progress(film.id, session) == {
+        'total': DEPTH, 'imported': config.CAST_PAGE_SIZE, 'status': cast_import.RUNNING,
+    }
+
+    cast_import.import_rest(session, film.id)
+    assert count_links(session) == DEPTH
+    assert cast_import.get_progress(film.id, session)['status'] == cast_import.DONE
+    assert session.scalar(select(func.count()).select_from(Actor)) == DEPTH
+
+
+def test_failed_actors(session: Session, monkeypatch) -> None:
+    """
+    Test that actors failing to fetch are fetched outside a transaction, kept and retried.
+
+    Args:
+        session (Session): The database session.
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    unavailable = {cast[1]['imdb_id'], cast[6]['imdb_id']}
+
+    def flaky_fetch_all(model, imdb_ids: list, workers: int) -> list:  # noqa: WPS430
+        assert not session.in_transaction()
+        fetched = fake_fetch_all(model, imdb_ids, workers)
+        return [
+            None if actor_data['imdb_id'] in unavailable else actor_data
+            for actor_data in fetched
+        ]
+
+    monkeypatch.setattr(cast_import, 'fetch_all', flaky_fetch_all)
+    film = Film(title='Test film', last_synced_at=datetime.now())
+    session.add(film)
+    session.commit()
+
+    cast_import.start(session, film.id, 'tt0111161', DEPTH)
+    cast_import.import_rest(session, film.id)
+    assert count_links(session) == DEPTH - len(unavailable)
+    assert cast_import.get_progress(film.id, session) == {
+        'total': DEPTH, 'imported': DEPTH - len(unavailable), 'status': cast_import.FAILED,
+    }
+
+    unavailable.clear()
+    assert cast_import.resume(session) == 1
+    assert count_links(session) == DEPTH
+    assert cast_import.get_progress(film.id, session) == {
+        'total': DEPTH, 'imported': DEPTH, 'status': cast_import.DONE,
+    }
@@ -0,0 +1,58 @@
+"""Module for change feed tests on an in-memory database."""
+
+
+import pytest
+from flask.testing import FlaskClient
+from sqlalchemy.orm import Session
+
+import app
+import db
+from models import Actor, Film, FilmToActor
+
+CAST_SIZE = 2
+
+
+@pytest.fixture(name='client')
+def memory_client(memory_session: Session, monkeypatch) -> FlaskClient:
+    """
+    Serve the app from an in-memory database.
+
+    Args:
+        memory_session (Session): The session of the in-memory database.
+        monkeypatch: The pytest monkeypatch fixture.
+
+    Returns:
+        FlaskClient: The test client.
+    """
+    monkeypatch.setattr(app, 'engine', memory_session.get_bind())
+    return app.app.test_client()
+
+
+def test_film_delete_changes(client: FlaskClient, memory_session: Session) -> None:
+    """
+    Test that deleting a film logs the deletes of its cascaded links before the film.
+
+    Args:
+        client (FlaskClient): The test client.
+        memory_session (Session): The session of the in-memory database.
+    """
+    film = Film(title='Test film')
+    film.actors = [Actor(full_name=f'Actor {number}') for number in range(CAST_SIZE)]
+    memory_session.add(film)
+    memory_session.commit()
+    link_ids = {str(link.id) for link in memory_session.query(FilmToActor)}
+    film_id = str(film.id)
+    cursor = client.get('/changes').json['cursor']
+
+    assert db.delete_film(film.id, memory_session)
+    log = client.get(f'/changes?cursor={cursor}').json['changes']
+    link_changes = [change for change in log if change['table'] == FilmToActor.__tablename__]
+    assert link_ids == {change['row_id'] for change in link_changes}
+    assert all(
+        (change['operation'], change['row']['film_id']) == ('delete', film_id)
+        for change in link_changes
+    )
+    assert len(log) == CAST_SIZE + 1
+    assert (log[-1]['table'], log[-1]['operation'], log[-1]['row_id']) == (
+        Film.__tablename__, 'delete', film_id,
+    )
@@ -0,0 +1,33 @@
+"""Module for db write function tests on an in-memory database."""
+
+
+from sqlalchemy.orm import Session
+
+import db
+from models import Actor, Film, FilmToActor
+
+
+def test_update_film_to_actor(memory_session: Session) -> None:
+    """
+    Test that a link is updated by its id alone, ignoring unknown keys, and can change film.
+
+    Args:
+        memory_session (Session): The session of the in-memory database.
+    """
+    first, second, actor = Film(title='First'), Film(title='Second'), Actor(full_name='Actor')
+    memory_session.add_all([first, second, actor])
+    memory_session.flush()
+    link = FilmToActor(film_id=first.id, actor_id=actor.id, character='Hero')
+    memory_session.add(link)
+    memory_session.commit()
+
+    assert db.update_film_to_actor(
+        {'id': link.id, 'character': 'Villain', 'unknown_field': 'Ignored'}, memory_session,
+    )
+    memory_session.refresh(link)
+    assert (link.film_id, link.character) == (first.id, 'Villain')
+
+    assert db.update_film_to_actor({'id': link.id, 'film_id': second.id}, memory_session)
+    memory_session.refresh(link)
+    assert (link.film_id, link.character) == (second.id, 'Villain')
+    assert db.update_film_to_actor({'id': first.id, 'character': 'Nobody'}, memory_session) is None
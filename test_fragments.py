@@ -0,0 +1,82 @@
+"""Module for card fragment cache tests."""
+
+
+from jinja2 import DictLoader, Environment
+
+import fragments
+
+CARD = 'card.html'
+FIELDS = ('id', 'title')
+
+
+class CountingEnvironment(Environment):
+    """Jinja environment counting the templates it hands out for rendering."""
+
+    def __init__(self, **kwargs) -> None:
+        """
+        Initialize the environment with no templates handed out.
+
+        Args:
+            kwargs: The keyword arguments of Environment.
+        """
+        super().__init__(**kwargs)
+        self.renders = 0
+
+    def get_template(self, *args, **kwargs):
+        """
+        Count the lookup and return the template.
+
+        Args:
+            args: The positional arguments of Environment.get_template.
+            kwargs: The keyword arguments of Environment.get_template.
+
+        Returns:
+            Template: The template.
+        """
+        self.renders += 1
+        return super().get_template(*args, **kwargs)
+
+
+def card_cache(max_entries: int) -> fragments.FragmentCache:
+    """
+    Create a fragment cache of a card showing the film title.
+
+    Args:
+        max_entries (int): The maximum number of cached cards.
+
+    Returns:
+        FragmentCache: The cache.
+    """
+    environment = CountingEnvironment(
+        loader=DictLoader({CARD: '<li>{{ entity["title"] }}</li>'}),
+        autoescape=True,
+    )
+    return fragments.FragmentCache(environment, max_entries)
+
+
+def test_cached_card() -> None:
+    """Test that an unchanged entity reuses its card and an updated one is rendered again."""
+    cache = card_cache(max_entries=10)
+    film = {'id': 1, 'title': 'Heat', 'year': 1995}
+    assert cache.render(CARD, FIELDS, film) == '<li>Heat</li>'
+    assert cache.render(CARD, FIELDS, {**film, 'year': 1996}) == '<li>Heat</li>'
+    assert cache.environment.renders == 1
+    assert cache.render(CARD, FIELDS, {**film, 'title': '<Heat>'}) == '<li>&lt;Heat&gt;</li>'
+    assert cache.environment.renders == 2
+
+
+def test_eviction() -> None:
+    """Test that the least recently used card is evicted and a size of 0 disables caching."""
+    cache = card_cache(max_entries=2)
+    films = [{'id': number, 'title': f'Film {number}'} for number in range(3)]
+    for film in (*films[:2], films[0], films[2]):
+        cache.render(CARD, FIELDS, film)
+    cache.render(CARD, FIELDS, films[0])
+    assert cache.environment.renders == 3
+    cache.render(CARD, FIELDS, films[1])
+    assert cache.environment.renders == 4
+
+    uncached = card_cache(max_entries=0)
+    uncached.render(CARD, FIELDS, films[0])
+    uncached.render(CARD, FIELDS, films[0])
+    assert uncached.environment.renders == 2
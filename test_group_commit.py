@@ -0,0 +1,96 @@
+"""Module for group commit tests on a database file."""
+
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import create_engine, event, func, select
+from sqlalchemy.orm import Session
+
+import group_commit
+from models import Actor, Base, Change
+
+WRITERS = 8
+LONG_WINDOW = 10
+
+
+@pytest.fixture(name='engine')
+def file_engine(tmp_path):
+    """
+    Create the tables in a database file and count the commits.
+
+    Args:
+        tmp_path: The pytest temporary directory.
+
+    Returns:
+        Engine: The engine, with the number of commits in engine.commits.
+    """
+    engine = create_engine(f'sqlite:///{tmp_path}/catalogue.db')
+    Base.metadata.create_all(engine)
+    engine.commits = 0
+
+    @event.listens_for(engine, 'commit')
+    def count_commit(connection) -> None:  # noqa: WPS430
+        engine.commits += 1
+
+    return engine
+
+
+def submit_all(committer: group_commit.GroupCommitter, writes: list[dict]) -> list:
+    """
+    Submit actor creates from concurrent threads.
+
+    Args:
+        committer (GroupCommitter): The committer.
+        writes (list[dict]): The actor column values, one per thread.
+
+    Returns:
+        list: The futures of the creates, in the order of the writes.
+    """
+    with ThreadPoolExecutor(len(writes)) as executor:
+        return [executor.submit(committer.submit, Actor, write) for write in writes]
+
+
+def test_one_commit(engine) -> None:
+    """
+    Test that concurrent creates get their own ids from a single commit.
+
+    Args:
+        engine: The database engine.
+    """
+    committer = group_commit.GroupCommitter(engine, LONG_WINDOW, max_batch=WRITERS)
+    writes = [{'full_name': f'Actor {number}'} for number in range(WRITERS)]
+    actor_ids = [future.result() for future in submit_all(committer, writes)]
+    assert engine.commits == 1
+    with Session(engine) as session:
+        names = dict(session.execute(select(Actor.id, Actor.full_name)).all())
+        assert [names[actor_id] for actor_id in actor_ids] == [
+            write['full_name'] for write in writes
+        ]
+        assert session.scalar(select(func.count()).select_from(Change)) == WRITERS
+
+
+def test_rejected_writes(engine) -> None:
+    """
+    Test that rejected creates fail alone and the rest of the batch is committed.
+
+    Args:
+        engine: The database engine.
+    """
+    committer = group_commit.GroupCommitter(engine, LONG_WINDOW, max_batch=4)
+    writes = [
+        {'full_name': 'First', 'imdb_id': 'nm0000001'},
+        {'full_name': 'Duplicate', 'imdb_id': 'nm0000001'},
+        {'full_name': 'Unknown field', 'nickname': 'Nick'},
+        {'full_name': 'Second'},
+    ]
+    first, duplicate, unknown, second = submit_all(committer, writes)
+    assert first.result() is not None
+    assert duplicate.result() is None
+    with pytest.raises(TypeError):
+        unknown.result()
+    assert second.result() is not None
+    with Session(engine) as session:
+        names = set(session.scalars(select(Actor.full_name)))
+        assert names == {'First', 'Second'}
+        assert session.scalar(select(func.count()).select_from(Change)) == 2
@@ -0,0 +1,155 @@
+"""Module for image proxy tests against a local fake image origin."""
+
+
+import io
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from PIL import Image
+
+import config
+import images
+
+POSTER_SIZE = (800, 1200)
+POSTER_PATH = '/poster.png'
+SECOND_WIDTH = 150
+
+
+def make_png(size: tuple[int, int]) -> bytes:
+    """
+    Generate a PNG image.
+
+    Args:
+        size (tuple[int, int]): The width and height of the image.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    output = io.BytesIO()
+    Image.new('RGB', size, 'red').save(output, 'PNG')
+    return output.getvalue()
+
+
+class FakeOrigin(BaseHTTPRequestHandler):
+    """Request handler serving a single poster and counting the requests to it."""
+
+    hits: list = []
+    poster = make_png(POSTER_SIZE)
+
+    def do_GET(self) -> None:  # noqa: N802
+        """Serve the poster or respond with 404 for any other path."""
+        self.hits.append(self.path)
+        if self.path != POSTER_PATH:
+            self.send_response(config.NOT_FOUND)
+            self.end_headers()
+            return
+        self.send_response(config.OK)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(self.poster)))
+        self.end_headers()
+        self.wfile.write(self.poster)
+
+    def log_message(self, *args) -> None:
+        """
+        Silence the request log.
+
+        Args:
+            args: The log message format and its arguments.
+        """
+
+
+@pytest.fixture(name='origin')
+def fake_origin():
+    """
+    Run the fake image origin in a background thread.
+
+    Yields:
+        str: The base URL of the origin.
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeOrigin)
+    FakeOrigin.hits.clear()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'http://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    server.server_close()
+
+
+def test_thumbnail_is_resized_and_cached(origin: str, tmp_path) -> None:
+    """
+    Test that a thumbnail keeps the aspect ratio and the origin is hit only once.
+
+    Args:
+        origin (str): The base URL of the fake image origin.
+        tmp_path: The cache directory.
+    """
+    url = f'{origin}{POSTER_PATH}'
+    digest, thumbnail_bytes = images.get_thumbnail(url, config.THUMBNAIL_WIDTH, tmp_path)
+    with Image.open(io.BytesIO(thumbnail_bytes)) as thumbnail:
+        assert thumbnail.size == (config.THUMBNAIL_WIDTH, config.THUMBNAIL_WIDTH * 3 // 2)
+    assert images.get_thumbnail(url, config.THUMBNAIL_WIDTH, tmp_path) == (
+        digest, thumbnail_bytes,
+    )
+    images.get_thumbnail(url, SECOND_WIDTH, tmp_path)
+    assert FakeOrigin.hits == [POSTER_PATH]
+
+
+def test_missing_image(origin: str, tmp_path) -> None:
+    """
+    Test that an origin error is reported as ImageFetchError.
+
+    Args:
+        origin (str): The base URL of the fake image origin.
+        tmp_path: The cache directory.
+    """
+    with pytest.raises(images.ImageFetchError):
+        images.get_thumbnail(f'{origin}/missing.png', config.THUMBNAIL_WIDTH, tmp_path)
+
+
+def test_evict(origin: str, tmp_path) -> None:
+    """
+    Test that eviction keeps the cache within its size bound.
+
+    Args:
+        origin (str): The base URL of the fake image origin.
+        tmp_path: The cache directory.
+    """
+    url = f'{origin}{POSTER_PATH}'
+    _, thumbnail = images.get_thumbnail(url, config.THUMBNAIL_WIDTH, tmp_path)
+    assert images.evict(tmp_path, len(thumbnail)) == 1
+    assert len(list(tmp_path.glob(f'{images.REFS}/*/*'))) == 1
+    assert images.evict(tmp_path, 0) == 1
+    assert not list(tmp_path.glob(f'{images.REFS}/*/*'))
+    images.get_thumbnail(url, config.THUMBNAIL_WIDTH, tmp_path)
+    assert FakeOrigin.hits == [POSTER_PATH, POSTER_PATH]
+
+
+def test_evicted_during_lookup(origin: str, tmp_path, monkeypatch) -> None:
+    """
+    Test that a blob evicted by another process right after its lookup is a cache miss.
+
+    Args:
+        origin (str): The base URL of the fake image origin.
+        tmp_path: The cache directory.
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    url = f'{origin}{POSTER_PATH}'
+    cached = images.get_thumbnail(url, config.THUMBNAIL_WIDTH, tmp_path)
+    lookup = images._lookup  # noqa: WPS437
+
+    def evicting_lookup(cache_dir, key: str) -> str | None:  # noqa: WPS430
+        digest = lookup(cache_dir, key)
+        images.evict(cache_dir, 0)
+        return digest
+
+    monkeypatch.setattr(images, '_lookup', evicting_lookup)
+    assert images.get_thumbnail(url, config.THUMBNAIL_WIDTH, tmp_path) == cached
+    assert FakeOrigin.hits == [POSTER_PATH, POSTER_PATH]
+
+
+def test_sign_url() -> None:
+    """Test that the signature depends on both the URL and the width."""
+    signature = images.sign_url(POSTER_PATH, config.THUMBNAIL_WIDTH, 'secret')
+    assert signature != images.sign_url(POSTER_PATH, SECOND_WIDTH, 'secret')
+    assert signature != images.sign_url('/other.png', config.THUMBNAIL_WIDTH, 'secret')
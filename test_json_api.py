@@ -0,0 +1,85 @@
+"""Module for JSON read API tests."""
+
+
+import gzip
+import json
+import uuid
+from datetime import date
+
+import pytest
+import requests
+from flask import Flask, request
+
+import config
+import json_api
+from test_pages import URL, headers
+
+YEAR = 2000
+flask_app = Flask(__name__)
+films = [
+    {'id': uuid.uuid4(), 'title': f'Film {number}', 'year': YEAR + number}
+    for number in range(100)
+]
+
+
+def test_requested_fields() -> None:
+    """Test that ?fields= keeps the resource order and rejects unknown fields."""
+    assert json_api.requested_fields(None, json_api.FILM_FIELDS) == json_api.FILM_FIELDS
+    assert json_api.requested_fields('year, title', json_api.FILM_FIELDS) == ('title', 'year')
+    with pytest.raises(json_api.UnknownFieldsError, match='budget'):
+        json_api.requested_fields('title,budget', json_api.FILM_FIELDS)
+
+
+@pytest.mark.parametrize('orjson', [json_api.orjson, None])
+def test_dumps(monkeypatch, orjson) -> None:
+    """
+    Test that both serializers write UUIDs and dates as strings.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+        orjson: The orjson module or None for the json fallback.
+    """
+    monkeypatch.setattr(json_api, 'orjson', orjson)
+    film_id = uuid.uuid4()
+    assert json.loads(json_api.dumps({'id': film_id, 'date': date(YEAR, 1, 2)})) == {
+        'id': str(film_id), 'date': '2000-01-02',
+    }
+
+
+def test_compression_and_revalidation() -> None:
+    """Test that a large listing is gzipped on request and revalidated by its ETag."""
+    with flask_app.test_request_context(headers={'Accept-Encoding': 'gzip'}):
+        response = json_api.json_response(films, request)
+    assert response.status_code == config.OK
+    assert response.content_encoding == 'gzip'
+    assert 'Accept-Encoding' in response.vary
+    assert json.loads(gzip.decompress(response.get_data()))[0]['title'] == 'Film 0'
+
+    etag = response.headers['ETag']
+    with flask_app.test_request_context(headers={'If-None-Match': etag}):
+        revalidated = json_api.json_response(films, request)
+    assert revalidated.status_code == config.NOT_MODIFIED
+    assert 'Content-Encoding' not in revalidated.headers
+
+
+def test_film_api() -> None:
+    """Test the film detail endpoint with field selection and conditional GET."""
+    film_id = requests.post(
+        f'{URL}film/create', headers=headers, data=json.dumps({'title': 'Test film'}), timeout=10,
+    ).content.decode()
+    link = f'{URL}api/films/{film_id}'
+    response = requests.get(link, params={'fields': 'title,cast'}, timeout=10)
+    assert response.status_code == config.OK
+    assert response.json() == {'title': 'Test film', 'cast': []}
+    revalidated = requests.get(
+        link,
+        params={'fields': 'title,cast'},
+        headers={'If-None-Match': response.headers['ETag']},
+        timeout=10,
+    )
+    assert revalidated.status_code == config.NOT_MODIFIED
+    unknown = requests.get(link, params={'fields': 'budget'}, timeout=10)
+    assert unknown.status_code == config.BAD_REQUEST
+    requests.delete(
+        f'{URL}film/delete', headers=headers, data=json.dumps({'id': film_id}), timeout=10,
+    )
@@ -0,0 +1,28 @@
+"""Module for model id tests."""
+
+
+import time
+
+import models
+
+IDS_COUNT = 100
+PAUSE = 0.001
+
+
+def test_uuid7_layout() -> None:
+    """Test that uuid7 sets the version, the variant and the current Unix time in ms."""
+    before = time.time_ns() // models.NANOSECONDS_PER_MILLISECOND
+    generated = models.uuid7()
+    after = time.time_ns() // models.NANOSECONDS_PER_MILLISECOND
+    assert generated.version == 7
+    assert generated.variant == 'specified in RFC 4122'
+    assert before <= generated.int >> (models.LOW_BITS + models.VERSION_FIELD_BITS) <= after
+
+
+def test_uuid7_time_ordered() -> None:
+    """Test that ids generated one after another sort in generation order."""
+    generated = []
+    for _ in range(IDS_COUNT):
+        generated.append(models.uuid7())
+        time.sleep(PAUSE)
+    assert generated == sorted(generated)
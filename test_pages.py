@@ -83,3 +83,46 @@ def test_post_delete(model: str, model_data: dict) -> None:
         timeout=10,
     )
     assert delete_bad_req.status_code == config.BAD_REQUEST
+
+
+def read_changes_head() -> int:
+    """
+    Page through the change feed up to its end.
+
+    Returns:
+        int: The cursor of the last change.
+    """
+    cursor = -1
+    next_cursor = 0
+    while next_cursor != cursor:
+        cursor = next_cursor
+        response = requests.get(f'{URL}changes', params={'cursor': cursor}, timeout=10)
+        next_cursor = response.json()['cursor']
+    return cursor
+
+
+def test_changes() -> None:
+    """Test that creating and deleting an actor appears in the change feed in order."""
+    cursor = read_changes_head()
+    actor_id = requests.post(
+        f'{URL}actor/{CREATE}',
+        headers=headers,
+        data=json.dumps(actor_data),
+        timeout=10,
+    ).content.decode()
+    requests.delete(
+        f'{URL}actor/{DELETE}',
+        headers=headers,
+        data=json.dumps({'id': actor_id}),
+        timeout=10,
+    )
+    response = requests.get(
+        f'{URL}changes', params={'cursor': cursor, 'wait': 5}, timeout=10,
+    )
+    assert response.status_code == config.OK
+    feed = response.json()['changes']
+    assert [(change['row_id'], change['operation']) for change in feed] == [
+        (actor_id, 'insert'),
+        (actor_id, 'delete'),
+    ]
+    assert feed[0]['row']['full_name'] == actor_data['full_name']
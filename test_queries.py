@@ -0,0 +1,128 @@
+"""Module for query budget tests of the db functions and the pages."""
+
+
+import json
+
+import pytest
+import requests
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import db
+import query_counter
+from models import Actor, Film
+from test_pages import URL, headers
+
+CAST_SIZE = 3
+FILMS_COUNT = 3
+PAGE_BUDGETS = (
+    ('', 1),
+    # The film, its cast, the progress of its cast import and the similar films.
+    ('film/{film_id}', 4),
+    ('actor/{actor_id}', 1),
+)
+
+
+@pytest.fixture(name='session')
+def instrumented_session(memory_session: Session) -> Session:
+    """
+    Create films with their casts in an instrumented in-memory database.
+
+    Args:
+        memory_session (Session): The session of the in-memory database.
+
+    Returns:
+        Session: The database session.
+    """
+    query_counter.install(memory_session.get_bind())
+    for film_number in range(FILMS_COUNT):
+        film = Film(title=f'Film {film_number}')
+        film.actors = [
+            Actor(full_name=f'Actor {film_number} {number}') for number in range(CAST_SIZE)
+        ]
+        memory_session.add(film)
+    memory_session.commit()
+    return memory_session
+
+
+def test_db_budgets(session: Session) -> None:
+    """
+    Test that reading a film page from the db module costs one query per function.
+
+    Args:
+        session (Session): The database session.
+    """
+    film_id = session.scalars(select(Film.id)).first()
+    session.expunge_all()
+    assert query_counter.query_budget(1)(db.get_film)(film_id, session)['id'] == film_id
+    actors = query_counter.query_budget(1)(db.get_film_actors)(film_id, session)
+    assert len(actors) == CAST_SIZE
+    assert len(query_counter.query_budget(1)(db.get_all_films)(session)) == FILMS_COUNT
+
+
+def test_n_plus_one_reported(session: Session) -> None:
+    """
+    Test that lazy loading the casts of all films exceeds the budget and reports the queries.
+
+    Args:
+        session (Session): The database session.
+    """
+    session.expunge_all()
+    executed = FILMS_COUNT + 1
+    lazy_loads = '.*= film_to_actor.film_id' * FILMS_COUNT
+    with pytest.raises(
+        query_counter.QueryBudgetExceeded,
+        match=f'(?s)^{executed} statements executed, budget is 1{lazy_loads}',
+    ):
+        with query_counter.count_queries(1):
+            for film in session.scalars(select(Film)):
+                assert len(film.actors) == CAST_SIZE
+
+
+def create(model: str, model_data: dict) -> str:
+    """
+    Create a record through the API.
+
+    Args:
+        model (str): The name of the model.
+        model_data (dict): The record data.
+
+    Returns:
+        str: The ID of the created record.
+    """
+    return requests.post(
+        f'{URL}{model}/create', headers=headers, data=json.dumps(model_data), timeout=10,
+    ).content.decode()
+
+
+@pytest.mark.parametrize('path, budget', PAGE_BUDGETS)
+def test_page_budgets(path: str, budget: int) -> None:
+    """
+    Test that the pages stay within their query budgets.
+
+    Requires the server to run with QUERY_COUNT_HEADER=true.
+
+    Args:
+        path (str): The page path template.
+        budget (int): The allowed number of queries.
+
+    Raises:
+        QueryBudgetExceeded: If the page exceeds its budget, with the executed statements.
+    """
+    film_id = create('film', {'title': 'Test film'})
+    actor_ids = [create('actor', {'full_name': f'Test name {number}'}) for number in range(2)]
+    for actor_id in actor_ids:
+        create('film_to_actor', {'film_id': film_id, 'actor_id': actor_id})
+    response = requests.get(
+        f'{URL}{path.format(film_id=film_id, actor_id=actor_ids[0])}', timeout=10,
+    )
+    statements = json.loads(response.headers[query_counter.STATEMENTS_HEADER])
+    if len(statements) > budget:
+        raise query_counter.QueryBudgetExceeded(budget, statements)
+    requests.delete(
+        f'{URL}film/delete', headers=headers, data=json.dumps({'id': film_id}), timeout=10,
+    )
+    for created_id in actor_ids:
+        requests.delete(
+            f'{URL}actor/delete', headers=headers, data=json.dumps({'id': created_id}), timeout=10,
+        )
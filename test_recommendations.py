@@ -0,0 +1,159 @@
+"""Module for similar films tests on an in-memory database."""
+
+
+import pytest
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+import config
+import db
+import recommendations
+from changes import record_changes
+from models import Actor, Film, FilmToActor, SimilarFilm
+
+NO_WEIGHTS = (0, 0)
+CASTS = (
+    ('Shared cast', (0, 1, 2)),
+    ('Two shared', (0, 1)),
+    ('One shared', (2,)),
+    ('Nothing shared', (3,)),
+)
+
+
+@pytest.fixture(name='session')
+def overlapping_casts_session(memory_session: Session) -> Session:
+    """
+    Create films whose casts overlap in an in-memory database.
+
+    Args:
+        memory_session (Session): The session of the in-memory database.
+
+    Returns:
+        Session: The database session.
+    """
+    actors = [Actor(full_name=f'Actor {number}') for number in range(4)]
+    memory_session.add_all(actors)
+    for title, cast in CASTS:
+        film = Film(title=title)
+        film.actors = [actors[position] for position in cast]
+        memory_session.add(film)
+    memory_session.commit()
+    return memory_session
+
+
+def film_ids(session: Session) -> dict:
+    """
+    Map the film titles to their ids.
+
+    Args:
+        session (Session): The database session.
+
+    Returns:
+        dict: The film ids by title.
+    """
+    return {film.title: film.id for film in session.query(Film)}
+
+
+def similar_titles(session: Session, film_id) -> list:
+    """
+    List the titles of the similar films of a film, the most similar first.
+
+    Args:
+        session (Session): The database session.
+        film_id: The film id.
+
+    Returns:
+        list: The titles.
+    """
+    return [
+        similar_film['title']
+        for similar_film in recommendations.get_similar_films(film_id, session)
+    ]
+
+
+def test_score() -> None:
+    """Test the Jaccard index and the year and country bonuses."""
+    same_film = ((2000, 'USA'), (2000, 'USA'))
+    assert recommendations.score(2, (3, 2), same_film, NO_WEIGHTS) == pytest.approx(2 / 3)
+    assert recommendations.score(2, (3, 2), same_film, (0.5, 0.5)) == pytest.approx(4 / 3)
+    unknown = ((None, None), (2000, 'USA'))
+    assert recommendations.score(1, (1, 1), unknown, (0.5, 0.5)) == 1
+
+
+def test_rebuild(session: Session) -> None:
+    """
+    Test that the rebuild ranks the films by cast overlap.
+
+    Args:
+        session (Session): The database session.
+    """
+    report = recommendations.rebuild(session, NO_WEIGHTS)
+    assert report['films'] == len(CASTS)
+    ids = film_ids(session)
+    assert similar_titles(session, ids['Shared cast']) == ['Two shared', 'One shared']
+    assert similar_titles(session, ids['Two shared']) == ['Shared cast']
+    assert not similar_titles(session, ids['Nothing shared'])
+
+
+def test_update(session: Session) -> None:
+    """
+    Test that a new link recomputes the lists of the films sharing its actor.
+
+    Args:
+        session (Session): The database session.
+    """
+    recommendations.rebuild(session, NO_WEIGHTS)
+    ids = film_ids(session)
+    actor = session.query(Actor).filter_by(full_name='Actor 2').one()
+    link = FilmToActor(film_id=ids['Nothing shared'], actor_id=actor.id)
+    session.add(link)
+    session.flush()
+    record_changes(session, 'insert', [link])
+    session.commit()
+
+    report = recommendations.update(session, NO_WEIGHTS)
+    assert report['changes'] == 1
+    assert similar_titles(session, ids['Nothing shared']) == ['One shared', 'Shared cast']
+    assert 'Nothing shared' in similar_titles(session, ids['Shared cast'])
+    assert recommendations.update(session, NO_WEIGHTS)['changes'] == 0
+
+
+def test_update_after_deletes(session: Session) -> None:
+    """
+    Test that deleting a link or an actor drops the films that no longer share an actor.
+
+    Args:
+        session (Session): The database session.
+    """
+    recommendations.rebuild(session, NO_WEIGHTS)
+    ids = film_ids(session)
+    actors = {actor.full_name: actor.id for actor in session.query(Actor)}
+    link = session.query(FilmToActor).filter_by(
+        film_id=ids['One shared'], actor_id=actors['Actor 2'],
+    ).one()
+    db.delete_film_to_actor(link.id, session)
+    recommendations.update(session, NO_WEIGHTS)
+    assert similar_titles(session, ids['Shared cast']) == ['Two shared']
+
+    db.delete_actor(actors['Actor 1'], session)
+    report = recommendations.update(session, NO_WEIGHTS)
+    assert report['films'] == 2
+    assert similar_titles(session, ids['Two shared']) == ['Shared cast']
+
+
+def test_update_after_film_delete(session: Session, monkeypatch) -> None:
+    """
+    Test that deleting a film replaces it in the lists of the films that shared its cast.
+
+    Args:
+        session (Session): The database session.
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(config, 'SIMILAR_FILMS_K', 1)
+    recommendations.rebuild(session, NO_WEIGHTS)
+    ids = film_ids(session)
+    assert similar_titles(session, ids['Shared cast']) == ['Two shared']
+    db.delete_film(ids['Two shared'], session)
+    recommendations.update(session, NO_WEIGHTS)
+    assert similar_titles(session, ids['Shared cast']) == ['One shared']
+    assert ids['Two shared'] not in session.scalars(select(SimilarFilm.similar_film_id)).all()
@@ -0,0 +1,113 @@
+"""Module for catalogue refresh tests."""
+
+
+import time
+from datetime import date, datetime
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import config
+import imdb_api
+import refresh
+from models import NEVER_SYNCED, Actor, Change, Film
+
+RATE = 20
+REQUESTS = 5
+stored_data = {'title': 'Test film', 'imdb_rating': 7.5, 'year': 1994, 'country': 'USA'}
+FIRST_SYNC = datetime.fromisoformat(NEVER_SYNCED)
+BIRTH_DATE = '1958-10-16'
+fresh_films = {
+    'tt0000001': {**stored_data, 'imdb_rating': 8.1},
+    'tt0000002': stored_data,
+}
+
+
+def failing_fetch(imdb_id: str) -> dict:
+    """
+    Imitate an external API error.
+
+    Args:
+        imdb_id (str): The IMDb ID of the row.
+
+    Raises:
+        ForeignApiError: Always.
+    """
+    raise imdb_api.ForeignApiError(config.FORBIDDEN)
+
+
+def fake_fetch(imdb_id: str) -> dict:
+    """
+    Imitate the API with one changed film, one unchanged film and failures for the rest.
+
+    Args:
+        imdb_id (str): The IMDb ID of the row.
+
+    Returns:
+        dict: The fresh film data.
+
+    Raises:
+        ForeignApiError: For films missing from fresh_films.
+    """
+    if imdb_id not in fresh_films:
+        raise imdb_api.ForeignApiError(config.NOT_FOUND)
+    return fresh_films[imdb_id]
+
+
+def test_refresh_batch(memory_session: Session, monkeypatch) -> None:
+    """
+    Test that changed rows are written back and every checked row, failed or not, is synced.
+
+    Args:
+        memory_session (Session): The session of the in-memory database.
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    monkeypatch.setattr(refresh, 'FETCHERS', {Film: fake_fetch})
+    memory_session.add_all([
+        Film(**stored_data, imdb_id=f'tt000000{number}', last_synced_at=FIRST_SYNC)
+        for number in range(1, 4)
+    ])
+    memory_session.commit()
+
+    report = refresh.refresh_batch(memory_session, Film, batch_size=10, workers=2)
+    assert report == {'checked': 3, 'changed': 1, 'failed': 1}
+    films = {film.imdb_id: film for film in memory_session.scalars(select(Film))}
+    assert films['tt0000001'].imdb_rating == fresh_films['tt0000001']['imdb_rating']
+    assert all(film.last_synced_at > FIRST_SYNC for film in films.values())
+    assert memory_session.scalar(select(func.count()).select_from(Change)) == 1
+
+
+def test_changed_fields() -> None:
+    """Test that only the differing synced fields are written back."""
+    film = Film(**stored_data)
+    fresh_data = {**stored_data, 'imdb_id': 'tt0111161', 'imdb_rating': 7.6}
+    assert refresh.changed_fields(film, fresh_data, refresh.SYNCED_FIELDS[Film]) == {
+        'imdb_rating': fresh_data['imdb_rating'],
+    }
+
+
+def test_changed_fields_as_strings() -> None:
+    """Test that values returned as strings are compared in the types of their columns."""
+    film = Film(**stored_data)
+    fresh_data = {**stored_data, 'imdb_rating': '7.5', 'year': '1994'}
+    assert not refresh.changed_fields(film, fresh_data, refresh.SYNCED_FIELDS[Film])
+    assert refresh.changed_fields(
+        film, {**fresh_data, 'year': '1995'}, refresh.SYNCED_FIELDS[Film],
+    ) == {'year': 1995}
+    actor = Actor(full_name='Test name', birth_date=date.fromisoformat(BIRTH_DATE))
+    fresh_data = {'full_name': 'Test name', 'birth_date': BIRTH_DATE}
+    assert not refresh.changed_fields(actor, fresh_data, refresh.SYNCED_FIELDS[Actor])
+
+
+def test_fetch_safely() -> None:
+    """Test that an API failure is reported as a missing result."""
+    assert refresh.fetch_safely(failing_fetch, 'tt0111161') is None
+
+
+def test_rate_limiter() -> None:
+    """Test that the limiter spaces requests according to its rate."""
+    limiter = imdb_api.RateLimiter(RATE)
+    started = time.monotonic()
+    for _ in range(REQUESTS):
+        limiter.acquire()
+    assert time.monotonic() - started >= (REQUESTS - 2) / RATE
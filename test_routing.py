@@ -0,0 +1,122 @@
+"""Module for read replica routing tests."""
+
+
+import json
+import os
+import time
+
+import pytest
+import requests
+from sqlalchemy import create_engine, select, text
+
+import config
+import db
+import query_counter
+import routing
+from models import Actor
+from test_pages import URL, headers
+
+REPLICATION_WAIT = 10
+POLL_INTERVAL = 0.2
+
+
+@pytest.fixture(name='engines')
+def sqlite_engines(tmp_path):
+    """
+    Create a primary, two healthy replicas and one that cannot be opened.
+
+    Args:
+        tmp_path: The pytest temporary directory.
+
+    Returns:
+        tuple: The primary, the healthy replicas and the broken replica.
+    """
+    primary, first, second = (
+        create_engine(f'sqlite:///{tmp_path}/{name}.db') for name in ('primary', 'first', 'second')
+    )
+    broken = create_engine(f'sqlite:///{tmp_path}/missing/broken.db')
+    return primary, [first, second], broken
+
+
+def test_round_robin(engines: tuple) -> None:
+    """
+    Test that healthy replicas take turns and broken ones are skipped.
+
+    Args:
+        engines (tuple): The primary, the healthy replicas and the broken replica.
+    """
+    primary, healthy, broken = engines
+    pool = routing.ReplicaPool(primary, [healthy[0], broken, healthy[1]], check_interval=60)
+    assert [pool.reader() for _ in range(4)] == [healthy[0], healthy[1], healthy[1], healthy[0]]
+    assert routing.ReplicaPool(primary, [broken], check_interval=60).reader() is primary
+    assert routing.ReplicaPool(primary, [], check_interval=60).reader() is primary
+
+
+def test_health_recheck(engines: tuple, monkeypatch) -> None:
+    """
+    Test that a failed replica is checked again once the check interval has passed.
+
+    Args:
+        engines (tuple): The primary, the healthy replicas and the broken replica.
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    primary, healthy, _ = engines
+    pool = routing.ReplicaPool(primary, healthy[:1], check_interval=0)
+    monkeypatch.setattr(routing, 'ping', lambda engine: False)
+    assert pool.reader() is primary
+    monkeypatch.setattr(routing, 'ping', lambda engine: True)
+    assert pool.reader() is healthy[0]
+
+
+def test_ping_not_counted(engines: tuple) -> None:
+    """
+    Test that a due health check is left out of the query count of the read it routes.
+
+    Args:
+        engines (tuple): The primary, the healthy replicas and the broken replica.
+    """
+    primary, healthy, _ = engines
+    query_counter.install(healthy[0])
+    pool = routing.ReplicaPool(primary, healthy[:1], check_interval=0)
+    with query_counter.count_queries() as statements:
+        with db.Session(pool.reader()) as session:
+            session.execute(text('SELECT 2'))
+        assert statements == ['SELECT 2']
+
+
+def test_replica_urls(monkeypatch) -> None:
+    """
+    Test that replica entries without a host or a port are skipped.
+
+    Args:
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    monkeypatch.setenv('PG_REPLICA_HOSTS', 'replica:5433, host.docker.internal:,:5434,')
+    assert db.get_replica_urls() == [db.get_db_url('replica:5433')]
+    monkeypatch.setenv('PG_REPLICA_HOSTS', '')
+    assert not db.get_replica_urls()
+
+
+@pytest.mark.skipif(not os.environ.get('PG_REPLICA_PORT'), reason='no read replica configured')
+def test_replica_reads() -> None:
+    """Test that a write is read back at once by its browser and reaches the replica."""
+    replica = create_engine(db.get_db_url(f'localhost:{os.environ["PG_REPLICA_PORT"]}'))
+
+    browser = requests.Session()
+    actor_id = browser.post(
+        f'{URL}actor/create',
+        headers=headers,
+        data=json.dumps({'full_name': 'Test name'}),
+        timeout=10,
+    ).content.decode()
+    assert browser.get(f'{URL}api/actors/{actor_id}', timeout=10).status_code == config.OK
+
+    deadline = time.monotonic() + REPLICATION_WAIT
+    with db.Session(replica) as session:
+        while session.scalar(select(Actor).where(Actor.id == actor_id)) is None:
+            assert time.monotonic() < deadline
+            session.rollback()
+            time.sleep(POLL_INTERVAL)
+    browser.delete(
+        f'{URL}actor/delete', headers=headers, data=json.dumps({'id': actor_id}), timeout=10,
+    )
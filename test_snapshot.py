@@ -0,0 +1,94 @@
+"""Module for catalogue snapshot tests."""
+
+
+import uuid
+from datetime import date
+from types import SimpleNamespace
+
+import pytest
+
+import app
+import db
+import snapshot
+
+FILM_ID = uuid.uuid4()
+EMPTY_FILM_ID = uuid.uuid4()
+ACTOR_ID = uuid.uuid4()
+BIRTH_DATE = date.fromisoformat('1958-10-16')
+films = [
+    (FILM_ID, 'tt0111161', 'Test film', 9.3, 1994, 'poster.jpg', 'USA'),
+    (EMPTY_FILM_ID, None, 'Тестовый фильм', None, None, None, 'USA'),
+]
+actors = [(ACTOR_ID, 'nm0000209', 'Test name', '1.85 m', 'photo.jpg', BIRTH_DATE, None)]
+links = [(FILM_ID, ACTOR_ID, 'Test character'), (FILM_ID, uuid.uuid4(), 'Missing actor')]
+
+
+@pytest.fixture(name='catalogue')
+def catalogue_snapshot(tmp_path) -> snapshot.Snapshot:
+    """
+    Write and map a small snapshot.
+
+    Args:
+        tmp_path: The directory for the snapshot file.
+
+    Returns:
+        Snapshot: The mapped snapshot.
+    """
+    path = tmp_path / 'catalogue.snapshot'
+    snapshot.write_snapshot(path, 7, films, actors, links)
+    return snapshot.Snapshot(path)
+
+
+def test_films(catalogue: snapshot.Snapshot) -> None:
+    """
+    Test that films are read back with NULLs and non-ASCII strings intact.
+
+    Args:
+        catalogue (Snapshot): The mapped snapshot.
+    """
+    assert catalogue.version == 7
+    assert catalogue.get_film(FILM_ID) == {
+        'id': FILM_ID,
+        'imdb_id': 'tt0111161',
+        'title': 'Test film',
+        'imdb_rating': 9.3,
+        'year': 1994,
+        'poster': 'poster.jpg',
+        'country': 'USA',
+    }
+    assert catalogue.get_film(str(EMPTY_FILM_ID))['title'] == 'Тестовый фильм'
+    assert catalogue.get_film(EMPTY_FILM_ID)['year'] is None
+    assert catalogue.get_film(uuid.uuid4()) is None
+    assert catalogue.get_film('not-a-uuid') is None
+    all_films = catalogue.get_all_films()
+    assert {film['id'] for film in all_films} == {str(FILM_ID), str(EMPTY_FILM_ID)}
+
+
+def test_actors(catalogue: snapshot.Snapshot) -> None:
+    """
+    Test that actors and their characters are read back.
+
+    Args:
+        catalogue (Snapshot): The mapped snapshot.
+    """
+    actor = catalogue.get_actor(ACTOR_ID)
+    assert actor['birth_date'] == BIRTH_DATE
+    assert actor['place_of_birth'] is None
+    film_actors = catalogue.get_film_actors(FILM_ID)
+    assert film_actors == [{**actor, 'character': 'Test character'}]
+    assert catalogue.get_film_actors(EMPTY_FILM_ID) is None
+
+
+def test_snapshot_miss(catalogue: snapshot.Snapshot, monkeypatch) -> None:
+    """
+    Test that a film missing from a lagging snapshot is read from the database.
+
+    Args:
+        catalogue (Snapshot): The mapped snapshot.
+        monkeypatch: The pytest monkeypatch fixture.
+    """
+    new_film = {'id': uuid.uuid4(), 'title': 'Just added'}
+    monkeypatch.setattr(app, 'snapshots', SimpleNamespace(current=lambda session: catalogue))
+    monkeypatch.setattr(db, 'get_film', lambda film_id, session: new_film)
+    assert app.find_in_catalogue(None, 'get_film', FILM_ID)[0] is catalogue
+    assert app.find_in_catalogue(None, 'get_film', new_film['id']) == (db, new_film)